@@ -1,112 +1,395 @@
 # ant_colony.py
 import streamlit as st
 import numpy as np
-import random
-from geopy.distance import geodesic
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from anytime import SearchMonitor
+from construction import as_routes, nearest_neighbor_route
 from data_utils import read_waypoints_from_excel
+from distance_matrix import nearest_neighbors, num_waypoints, population_lengths, route_length
+from local_search import polish_route
+from random_utils import make_rng, spawn_rngs
+from shared_array import attach_shared_array, create_shared_array
 
-def distance_between_points(p1, p2):
-    return geodesic(p1, p2).kilometers
+# "as": Ant System, "mmas": MAX-MIN Ant System, "acs": Ant Colony System
+ACO_VARIANTS = ("as", "mmas", "acs")
+
+# MMAS: peluang membangun rute terbaik saat konvergen (untuk batas bawah feromon),
+# dan selang iterasi deposit oleh rute terbaik sejauh ini (selain itu oleh rute terbaik iterasi)
+MMAS_P_BEST = 0.05
+MMAS_BEST_SO_FAR_INTERVAL = 5
+
+# Array yang dibagikan ke worker lewat shared memory pada mode paralel; feromon diperbarui master di tempat
+_SHARED_ARRAYS = ("distance_matrix", "pheromone", "start_pheromone", "heuristic", "start_heuristic", "neighbors")
+_SHARED_PHEROMONE = ("pheromone", "start_pheromone")
+
+# Koloni di proses worker, dibuat sekali lewat initializer
+_worker_shm = None
+_worker_colony = None
+
+
+def _attach_colony(specs, alpha, variant):
+    global _worker_shm, _worker_colony
+    _worker_shm = []
+    arrays = {}
+    for name, spec in specs.items():
+        shm, arrays[name] = attach_shared_array(spec)
+        _worker_shm.append(shm)
+    _worker_colony = AntColony.from_shared(arrays, alpha, variant)
+
+
+def _construct_batch(n_ants, rng):
+    # Bangun n_ants rute dengan feromon terbaru di shared memory; hanya rute int32 dan jaraknya yang dikirim balik
+    _worker_colony.rng = rng
+    routes = _worker_colony.construct_routes(n_ants)
+    distances = population_lengths(_worker_colony.distance_matrix, routes)
+    return routes.astype(np.int32), distances, rng
 
-def total_distance(route, start_point, end_point):
-    distance = distance_between_points(start_point, route[0])
-    for i in range(len(route) - 1):
-        distance += distance_between_points(route[i], route[i + 1])
-    distance += distance_between_points(route[-1], end_point)
-    return distance
 
 class AntColony:
-    def __init__(self, waypoints, start_point, end_point, n_ants, n_best, n_iterations, decay, alpha, beta):
-        self.waypoints = waypoints
-        self.start_point = start_point
-        self.end_point = end_point
+    def __init__(self, distances, n_ants, n_best, n_iterations, decay, alpha, beta, local_search=None, seed=None,
+                 candidate_k=None, variant="as", q0=0.9, local_decay=0.1, stagnation_limit=50,
+                 n_workers=None, time_limit=None, patience=None, target_distance=None, callback=None,
+                 neighbors=None, initial_routes=None):
+        if variant not in ACO_VARIANTS:
+            raise ValueError(f"Varian ACO tidak dikenal: {variant!r}, pilih salah satu dari {ACO_VARIANTS}")
+        if n_workers and n_workers > 1 and variant == "acs":
+            # Local update ACS mengubah feromon di tengah konstruksi, tidak bisa dibagi antar proses
+            raise ValueError("Varian acs tidak mendukung n_workers > 1")
+        # distances: matriks (N+2)x(N+2) dari distance_matrix.build_distance_matrix
+        self.distance_matrix = distances
+        self.num_waypoints = num_waypoints(distances)
         self.n_ants = n_ants
         self.n_best = n_best
         self.n_iterations = n_iterations
+        # decay adalah faktor sisa feromon setiap iterasi (pheromone *= decay)
         self.decay = decay
         self.alpha = alpha
         self.beta = beta
-        
-        self.distances = self.calculate_distances_matrix()
-        self.pheromone = np.ones(self.distances.shape) / len(waypoints)
-
-    def calculate_distances_matrix(self):
-        num_waypoints = len(self.waypoints)
-        distances = np.zeros((num_waypoints, num_waypoints))
-        for i in range(num_waypoints):
-            for j in range(i + 1, num_waypoints):
-                distances[i][j] = distance_between_points(self.waypoints[i], self.waypoints[j])
-                distances[j][i] = distances[i][j]
-        return distances
+        # Polishing opsional dari local_search: None, "2opt", "or_opt", "3opt" atau "vnd"
+        self.local_search = local_search
+        self.rng = make_rng(seed)
+        self.variant = variant
+        # ACS: peluang memilih edge terbaik secara greedy dan laju local update
+        self.q0 = q0
+        self.local_decay = local_decay
+        # MMAS: feromon di-reset jika rute terbaik tidak membaik selama stagnation_limit iterasi
+        self.stagnation_limit = stagnation_limit
+        # Mode paralel: semut setiap iterasi dibagi ke n_workers proses, masing-masing dengan aliran RNG sendiri
+        # (diturunkan dari seed), sehingga hasil sama untuk seed dan n_workers yang sama
+        self.n_workers = n_workers or 1
+        self.worker_rngs = spawn_rngs(seed, self.n_workers)
+        # Berhenti lebih awal (batas waktu, stagnasi, target jarak) dan akses rute terbaik sementara
+        self.monitor = SearchMonitor(time_limit, patience, target_distance, callback)
+        # Rute awal dari construction (array (M, N)): menjadi rute terbaik awal dan menerima
+        # satu kali update feromon sebelum iterasi pertama
+        self.initial_routes = None if initial_routes is None else as_routes(initial_routes, self.num_waypoints)
+
+        # Jarak antar waypoint saja (tanpa baris/kolom depot)
+        self.distances = distances[:self.num_waypoints, :self.num_waypoints]
+        # Mode candidate list: semut hanya memilih di antara candidate_k tetangga terdekat,
+        # dan feromon hanya disimpan untuk edge kandidat (array (N, k), bukan N x N).
+        # neighbors (N, k) yang sudah dihitung, misalnya dari spatial_index, mengaktifkan mode ini tanpa memindai matriks
+        if neighbors is not None:
+            self.neighbors = np.asarray(neighbors, dtype=np.intp)
+        elif candidate_k:
+            self.neighbors = nearest_neighbors(distances, candidate_k)
+        else:
+            self.neighbors = None
+        shape = self.distances.shape if self.neighbors is None else self.neighbors.shape
+        self.pheromone = np.ones(shape) / self.num_waypoints
+        # Feromon edge start_point -> waypoint pertama (rute terbuka, tidak ada edge penutup)
+        self.start_pheromone = np.ones(self.num_waypoints) / self.num_waypoints
+        self.heuristic = None
+        self.start_heuristic = None
+        # Nilai awal feromon ACS dan batas feromon MMAS, diisi oleh optimize()
+        self.tau0 = None
+        self.tau_min = 0.0
+        self.tau_max = np.inf
+
+    @classmethod
+    def from_shared(cls, arrays, alpha, variant):
+        """
+        Koloni ringan untuk proses worker: memakai array dari shared memory tanpa menyalin
+        dan tanpa mengalokasikan feromon sendiri. Hanya untuk construct_routes.
+        """
+        colony = cls.__new__(cls)
+        colony.distance_matrix = arrays["distance_matrix"]
+        colony.num_waypoints = num_waypoints(colony.distance_matrix)
+        colony.distances = colony.distance_matrix[:colony.num_waypoints, :colony.num_waypoints]
+        colony.neighbors = arrays.get("neighbors")
+        colony.pheromone = arrays["pheromone"]
+        colony.start_pheromone = arrays["start_pheromone"]
+        colony.heuristic = arrays["heuristic"]
+        colony.start_heuristic = arrays["start_heuristic"]
+        colony.alpha = alpha
+        colony.variant = variant
+        colony.rng = None
+        return colony
 
     def route_distance(self, route):
-        return total_distance([self.waypoints[i] for i in route], self.start_point, self.end_point)
+        return route_length(self.distance_matrix, route)
+
+    def _edge_slots(self, i, j):
+        # Posisi edge i -> j di array feromon, serta mask edge yang tersimpan di sana
+        if self.neighbors is None:
+            return i, j, np.ones(len(i), dtype=bool)
+        match = self.neighbors[i] == j[:, None]
+        on_list = match.any(axis=1)
+        return i[on_list], np.argmax(match[on_list], axis=1), on_list
+
+    def _deposit(self, routes, amounts):
+        # Deposit batch dengan np.add.at: edge start_point -> waypoint pertama dan edge antar waypoint
+        np.add.at(self.start_pheromone, routes[:, 0], amounts)
+        if self.pheromone.size == 0 or routes.shape[1] < 2:
+            return
+        rows, cols, on_list = self._edge_slots(routes[:, :-1].ravel(), routes[:, 1:].ravel())
+        np.add.at(self.pheromone, (rows, cols), np.repeat(amounts, routes.shape[1] - 1)[on_list])
+
+    def pheromone_update(self, all_routes, all_distances, best_route=None, best_distance=None, iteration=0):
+        """
+        Update feromon global sesuai varian.
+        AS: n_best rute terbaik iterasi menyimpan 1/jarak.
+        MMAS: hanya satu rute (terbaik iterasi, atau terbaik sejauh ini setiap MMAS_BEST_SO_FAR_INTERVAL
+        iterasi) lalu feromon dibatasi [tau_min, tau_max].
+        ACS: hanya edge rute terbaik sejauh ini yang menguap dan menerima deposit.
+        """
+        all_routes = np.asarray(all_routes)
+        all_distances = np.asarray(all_distances, dtype=np.float64)
+        if best_route is None:
+            best = int(np.argmin(all_distances))
+            best_route, best_distance = all_routes[best], all_distances[best]
+        best_route = np.asarray(best_route).reshape(1, -1)
+
+        if self.variant == "acs":
+            first = best_route[0, 0]
+            self.start_pheromone[first] = self.decay * self.start_pheromone[first] + (1 - self.decay) / best_distance
+            if best_route.shape[1] > 1:
+                rows, cols, _ = self._edge_slots(best_route[0, :-1], best_route[0, 1:])
+                self.pheromone[rows, cols] = self.decay * self.pheromone[rows, cols] + (1 - self.decay) / best_distance
+            return
 
-    def pheromone_update(self, all_routes, all_distances):
         self.pheromone *= self.decay
-        sorted_routes = sorted(zip(all_routes, all_distances), key=lambda x: x[1])
-        for route, distance in sorted_routes[:self.n_best]:
-            for i in range(len(route) - 1):
-                self.pheromone[route[i]][route[i + 1]] += 1.0 / distance
-            self.pheromone[route[-1]][route[0]] += 1.0 / distance
-
-    def select_next_waypoint(self, pheromone_row, distance_row, visited):
-        # Membuat array boolean untuk visited
-        visited_mask = np.zeros(len(pheromone_row), dtype=bool)
-        visited_mask[list(visited)] = True  # Set true untuk indeks yang sudah dikunjungi
-        pheromone_row = np.copy(pheromone_row)
-        pheromone_row[visited_mask] = 0  # Set feromon pada titik yang sudah dikunjungi ke 0
-
-        # Avoid division by zero by adding a small epsilon to distance_row
+        self.start_pheromone *= self.decay
+        if self.variant == "mmas":
+            if iteration % MMAS_BEST_SO_FAR_INTERVAL == 0:
+                routes, distances = best_route, np.array([best_distance])
+            else:
+                best = int(np.argmin(all_distances))
+                routes, distances = all_routes[best:best + 1], all_distances[best:best + 1]
+            self._deposit(routes, 1.0 / distances)
+            self.set_pheromone_bounds(best_distance)
+            np.clip(self.pheromone, self.tau_min, self.tau_max, out=self.pheromone)
+            np.clip(self.start_pheromone, self.tau_min, self.tau_max, out=self.start_pheromone)
+            return
+
+        n_best = min(self.n_best, len(all_distances))
+        best = np.argpartition(all_distances, n_best - 1)[:n_best]
+        self._deposit(all_routes[best], 1.0 / all_distances[best])
+
+    def set_pheromone_bounds(self, best_distance):
+        # Batas feromon MMAS (Stützle & Hoos) dari jarak rute terbaik sejauh ini
+        rho = max(1.0 - self.decay, 1e-12)
+        self.tau_max = 1.0 / (rho * best_distance)
+        n = max(self.num_waypoints, 1)
+        p_dec = MMAS_P_BEST ** (1.0 / n)
+        avg_choices = max(self.pheromone.shape[1] / 2 if self.pheromone.ndim == 2 else n / 2, 2.0)
+        self.tau_min = min(self.tau_max * (1 - p_dec) / ((avg_choices - 1) * p_dec), self.tau_max)
+
+    def reset_pheromone(self, value):
+        self.pheromone.fill(value)
+        self.start_pheromone.fill(value)
+
+    def nearest_neighbor_length(self):
+        # Panjang rute nearest neighbor dari start_point, acuan nilai awal feromon MMAS/ACS
+        return route_length(self.distance_matrix, nearest_neighbor_route(self.distance_matrix))
+
+    def _heuristic(self, distances):
+        # Avoid division by zero by adding a small epsilon to distances
         epsilon = 1e-10
-        distance_row = np.where(distance_row == 0, epsilon, distance_row)  # Replace zero distances with epsilon
+        distances = np.where(distances == 0, epsilon, distances)
+        with np.errstate(over='ignore'):
+            return (1.0 / distances) ** self.beta
+
+    def choice_matrix(self):
+        """
+        Matriks bobot pemilihan pheromone**alpha * (1/jarak)**beta, dihitung sekali per iterasi.
+        """
+        if self.heuristic is None:
+            # (1/jarak)**beta tidak berubah antar iterasi, cukup dihitung sekali
+            distances = self.distances
+            if self.neighbors is not None:
+                distances = distances[np.arange(self.num_waypoints)[:, None], self.neighbors]
+            self.heuristic = self._heuristic(distances)
+            self.start_heuristic = self._heuristic(self.distance_matrix[self.num_waypoints, :self.num_waypoints])
+        with np.errstate(over='ignore'):
+            choice = (self.pheromone ** self.alpha) * self.heuristic
+        if self.neighbors is None:
+            np.fill_diagonal(choice, 0)
+        return choice
+
+    def _sample(self, weights):
+        # Satu undian per baris dengan cumsum; baris tanpa bobot valid ditandai False
+        cumulative = np.cumsum(weights, axis=1)
+        total = cumulative[:, -1]
+        draw = self.rng.random(len(weights)) * total
+        valid = np.isfinite(total) & (total > draw)
+        return np.argmax(cumulative > draw[:, None], axis=1), valid
 
-        # Menghitung probabilitas dengan memperhitungkan alpha dan beta
-        with np.errstate(divide='ignore', invalid='ignore'):
-            probabilities = (pheromone_row ** self.alpha) * ((1.0 / distance_row) ** self.beta)
+    def _select(self, weights):
+        choice, valid = self._sample(weights)
+        if self.variant == "acs":
+            # Aturan pseudo-random proportional: dengan peluang q0 ambil bobot terbesar
+            greedy = self.rng.random(len(weights)) < self.q0
+            choice[greedy] = np.argmax(weights[greedy], axis=1)
+        return choice, valid
 
-        # Create a list of unvisited points
-        unvisited = [i for i in range(len(pheromone_row)) if i not in visited]
+    def _local_update(self, pheromone, rows, cols, choice=None):
+        # Local update ACS pada edge yang baru dilewati, bobot pilihan ikut diperbarui
+        pheromone[rows, cols] = (1 - self.local_decay) * pheromone[rows, cols] + self.local_decay * self.tau0
+        if choice is not None:
+            with np.errstate(over='ignore'):
+                choice[rows, cols] = (pheromone[rows, cols] ** self.alpha) * self.heuristic[rows, cols]
 
-        # If all probabilities are zero or contain NaN values, choose randomly among unvisited nodes
-        if np.isnan(probabilities).any() or probabilities.sum() == 0:
-            return random.choice(unvisited)
+    def construct_routes(self, n_ants):
+        """
+        Bangun rute untuk n_ants semut sekaligus: semua semut maju satu langkah bersamaan
+        dengan mask visited 2-D berukuran (n_ants, N). Hasil berupa array (n_ants, N).
+        Mode candidate list hanya melihat k kandidat per langkah (O(k) per semut).
+        """
+        n = self.num_waypoints
+        choice = self.choice_matrix()
+        ants = np.arange(n_ants)
+        routes = np.empty((n_ants, n), dtype=np.intp)
+        visited = np.zeros((n_ants, n), dtype=bool)
+        if n == 0:
+            return routes
 
-        # Normalisasi probabilitas
-        probabilities /= probabilities.sum()
+        # Waypoint pertama dipilih dari edge start_point -> waypoint
+        with np.errstate(over='ignore'):
+            start_choice = (self.start_pheromone ** self.alpha) * self.start_heuristic
+        current, valid = self._select(np.tile(start_choice, (n_ants, 1)))
+        current[~valid] = self.rng.integers(0, n, size=int((~valid).sum()))
+        if self.variant == "acs":
+            self.start_pheromone[current] = ((1 - self.local_decay) * self.start_pheromone[current]
+                                             + self.local_decay * self.tau0)
+        routes[:, 0] = current
+        visited[ants, current] = True
 
-        # Pilih titik berikutnya berdasarkan probabilitas
-        return np.random.choice(len(pheromone_row), p=probabilities)
+        for step in range(1, n):
+            weights = choice[current]
+            if self.neighbors is None:
+                weights[visited] = 0
+            else:
+                candidates = self.neighbors[current]
+                weights[visited[ants[:, None], candidates]] = 0
+            slot, valid = self._select(weights)
+            nxt = slot if self.neighbors is None else candidates[ants, slot]
+            if not valid.all():
+                stuck = ~valid
+                if self.neighbors is None:
+                    # Jika semua bobot nol (atau overflow), pilih acak di antara titik yang belum dikunjungi
+                    fallback, _ = self._sample((~visited[stuck]).astype(np.float64))
+                else:
+                    # Semua kandidat sudah dikunjungi: pilih titik terdekat yang belum dikunjungi dari seluruh titik
+                    fallback = np.argmin(np.where(visited[stuck], np.inf, self.distances[current[stuck]]), axis=1)
+                nxt[stuck] = fallback
+            if self.variant == "acs":
+                self._local_update(self.pheromone, current[valid], slot[valid], choice)
+            current = nxt
+            routes[:, step] = current
+            visited[ants, current] = True
+        return routes
 
     def generate_route(self):
-        route = []
-        visited = set()
-        current = random.randint(0, len(self.waypoints) - 1)
-        route.append(current)
-        visited.add(current)
-        while len(visited) < len(self.waypoints):
-            next_city = self.select_next_waypoint(self.pheromone[current], self.distances[current], visited)
-            route.append(next_city)
-            visited.add(next_city)
-            current = next_city
-        return route
+        return self.construct_routes(1)[0].tolist()
+
+    @contextmanager
+    def _construction(self):
+        # Menghasilkan fungsi yang membangun semua rute satu iterasi: (routes, distances)
+        if self.n_workers <= 1:
+            yield lambda: self._construct_serial()
+            return
+
+        self.choice_matrix()  # pastikan heuristic sudah dihitung sebelum dibagikan
+        local = {name: getattr(self, name) for name in _SHARED_ARRAYS if getattr(self, name) is not None}
+        blocks = {}
+        try:
+            for name, array in local.items():
+                shm, spec = create_shared_array(np.ascontiguousarray(array))
+                blocks[name] = (shm, spec)
+                if name in _SHARED_PHEROMONE:
+                    # Master memperbarui feromon langsung di shared memory (semua update bersifat in-place)
+                    setattr(self, name, np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf))
+            specs = {name: spec for name, (_, spec) in blocks.items()}
+            batches = [len(chunk) for chunk in np.array_split(np.arange(self.n_ants), self.n_workers)]
+            with ProcessPoolExecutor(max_workers=self.n_workers, initializer=_attach_colony,
+                                     initargs=(specs, self.alpha, self.variant)) as executor:
+                def construct():
+                    futures = [executor.submit(_construct_batch, size, rng)
+                               for size, rng in zip(batches, self.worker_rngs) if size > 0]
+                    results = [future.result() for future in futures]
+                    for i, (_, _, rng) in enumerate(results):
+                        self.worker_rngs[i] = rng
+                    routes = np.concatenate([r for r, _, _ in results]).astype(np.intp)
+                    return routes, np.concatenate([d for _, d, _ in results])
+                yield construct
+        finally:
+            for name, (shm, _) in blocks.items():
+                if name in _SHARED_PHEROMONE:
+                    # Salin kembali ke memori biasa sebelum blok shared memory dilepas
+                    setattr(self, name, np.array(getattr(self, name)))
+                shm.close()
+                shm.unlink()
+
+    def _construct_serial(self):
+        routes = self.construct_routes(self.n_ants)
+        return routes, population_lengths(self.distance_matrix, routes)
 
     def optimize(self):
         #column for widget AG, ACO and PSO
         # col1, col2 , col3 = st.columns(3)
         best_route = None
         best_distance = float('inf')
-        for iteration in range(self.n_iterations):
-            all_routes = [self.generate_route() for _ in range(self.n_ants)]
-            all_distances = [self.route_distance(route) for route in all_routes]
-
-            self.pheromone_update(all_routes, all_distances)
-            shortest_distance = min(all_distances)
-            if shortest_distance < best_distance:
-                best_distance = shortest_distance
-                best_route = all_routes[all_distances.index(shortest_distance)]
-            print(f"best_route {best_route}")
-            print(f"Iterasi {iteration+1}/{self.n_iterations}, Jarak Terbaik: {best_distance:.2f} km")
-            # col2.write(f"Iterasi {iteration+1}/{self.n_iterations}, Jarak Terbaik: {best_distance:.2f} km")
-        
-        return best_route, best_distance
+        monitor = self.monitor
+        monitor.start(self.n_iterations)
+        if self.variant != "as" and self.num_waypoints > 0:
+            nn_distance = max(self.nearest_neighbor_length(), 1e-12)
+            if self.variant == "acs":
+                self.tau0 = 1.0 / (self.num_waypoints * nn_distance)
+                self.reset_pheromone(self.tau0)
+            else:
+                self.set_pheromone_bounds(nn_distance)
+                self.reset_pheromone(self.tau_max)
+        if self.initial_routes is not None and len(self.initial_routes):
+            seed_distances = population_lengths(self.distance_matrix, self.initial_routes)
+            shortest = int(np.argmin(seed_distances))
+            best_distance = float(seed_distances[shortest])
+            best_route = self.initial_routes[shortest].tolist()
+            monitor.report(best_route, best_distance)
+            self.pheromone_update(self.initial_routes, seed_distances, best_route, best_distance)
+        stall = 0
+        with self._construction() as construct:
+            for iteration in range(self.n_iterations):
+                all_routes, all_distances = construct()
+
+                shortest = int(np.argmin(all_distances))
+                if all_distances[shortest] < best_distance:
+                    best_distance = float(all_distances[shortest])
+                    best_route = all_routes[shortest].tolist()
+                    stall = 0
+                else:
+                    stall += 1
+                self.pheromone_update(all_routes, all_distances, best_route, best_distance, iteration)
+                if self.variant == "mmas" and stall >= self.stagnation_limit:
+                    # Stagnasi: kembalikan semua feromon ke tau_max agar semut kembali menjelajah
+                    self.reset_pheromone(self.tau_max)
+                    stall = 0
+                # col2.write(f"Iterasi {iteration+1}/{self.n_iterations}, Jarak Terbaik: {best_distance:.2f} km")
+                if monitor.step(best_route, best_distance):
+                    break
+
+        if self.local_search:
+            best_route, best_distance = polish_route(best_route, self.distance_matrix, self.local_search, self.neighbors)
+
+        return monitor.finish(best_route, best_distance)
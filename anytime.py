@@ -0,0 +1,111 @@
+# anytime.py
+
+import threading
+import time
+
+import numpy as np
+
+
+class SearchMonitor:
+    """
+    Pencatat solusi terbaik dan kriteria berhenti bersama untuk optimize() semua solver.
+
+    Solver memanggil start() sebelum iterasi pertama dan step() di akhir setiap iterasi;
+    step() mengembalikan True jika pencarian harus berhenti karena:
+    - time_limit: batas waktu (detik, wall-clock) sejak start() terlampaui
+    - patience: patience iterasi berturut-turut tanpa perbaikan
+    - target_distance: jarak terbaik sudah <= target_distance
+    - stop(): dipanggil dari luar, misalnya dari thread lain
+    Batas waktu diperiksa per iterasi, jadi satu iterasi yang sedang berjalan selalu diselesaikan.
+
+    Rute terbaik sementara bisa diambil kapan saja lewat best() (polling, aman dari thread lain),
+    atau lewat callback(monitor) yang dipanggil setelah setiap iterasi.
+    """
+
+    def __init__(self, time_limit=None, patience=None, target_distance=None, callback=None):
+        self.time_limit = time_limit
+        self.patience = patience
+        self.target_distance = target_distance
+        self.callback = callback
+        self._stop_event = threading.Event()
+        self.start()
+
+    def start(self, max_iterations=None):
+        # Reset catatan; permintaan stop() yang sudah masuk sebelum start tetap berlaku
+        self.max_iterations = max_iterations
+        self.iteration = 0
+        self.stall = 0
+        self.stop_reason = None
+        self._best = (float("inf"), None)
+        self._start_time = time.perf_counter()
+
+    def stop(self):
+        self._stop_event.set()
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self._start_time
+
+    def best(self):
+        """
+        Kembalikan (best_route, best_distance) saat ini; best_route None jika belum ada rute.
+        """
+        distance, route = self._best
+        return route, distance
+
+    @property
+    def best_route(self):
+        return self._best[1]
+
+    @property
+    def best_distance(self):
+        return self._best[0]
+
+    def report(self, route, distance):
+        """
+        Catat rute kandidat tanpa menghitung iterasi; kembalikan True jika lebih baik dari yang terbaik.
+        """
+        distance = float(distance)
+        if route is None or not distance < self._best[0]:
+            return False
+        if isinstance(route, np.ndarray):
+            route = route.tolist()
+        else:
+            route = list(route)
+        # Rute dan jarak ditulis sebagai satu tuple agar pembaca dari thread lain selalu melihat pasangan yang cocok
+        self._best = (distance, route)
+        return True
+
+    def step(self, route, distance, iterations=1):
+        """
+        Akhiri satu iterasi (atau beberapa sekaligus, misalnya satu epoch model pulau) dengan rute terbaiknya;
+        kembalikan True jika pencarian harus berhenti.
+        """
+        self.iteration += iterations
+        if self.report(route, distance):
+            self.stall = 0
+        else:
+            self.stall += iterations
+        if self.callback is not None:
+            self.callback(self)
+        return self.should_stop()
+
+    def should_stop(self):
+        if self._stop_event.is_set():
+            self.stop_reason = "stopped"
+        elif self.target_distance is not None and self.best_distance <= self.target_distance:
+            self.stop_reason = "target_distance"
+        elif self.patience is not None and self.stall >= self.patience:
+            self.stop_reason = "patience"
+        elif self.time_limit is not None and self.elapsed >= self.time_limit:
+            self.stop_reason = "time_limit"
+        return self.stop_reason is not None
+
+    def finish(self, route=None, distance=float("inf")):
+        """
+        Tutup pencarian, misalnya dengan rute hasil local search, lalu kembalikan (best_route, best_distance).
+        """
+        self.report(route, distance)
+        if self.stop_reason is None:
+            self.stop_reason = "iterations"
+        return self.best()
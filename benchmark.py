@@ -0,0 +1,331 @@
+# benchmark.py
+#
+# Benchmark kecepatan dan kualitas solver pada instance TSPLIB dan data sintetis Jakarta.
+#
+#   python benchmark.py run jakarta:100 jakarta:500 data/berlin52.tsp --seeds 0 1 2 --json hasil.json --csv hasil.csv
+#   python benchmark.py compare baseline.json hasil.json
+#
+# Instance sintetis ditulis "jakarta:<jumlah titik>[:<seed>]", instance lain dibaca sebagai file TSPLIB.
+
+import argparse
+import contextlib
+import csv
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from ant_colony import AntColony
+from binary_pso import BPSO_TSP
+from distance_matrix import build_distance_matrix
+from genetic import GA_TSP
+from genetic_2opt import GA_TSP as GA_2opt_TSP
+from lin_kernighan import LK_TSP
+from particle_swarm import PSO_TSP
+from random_key_pso import RandomKeyPSO_TSP
+
+# Depot yang dipakai streamlit_app.py sebagai start_point dan end_point
+JAKARTA_DEPOT = (-6.192649980767408, 106.83733906793265)
+
+# Panjang tur optimal (tertutup) yang diketahui untuk instance TSPLIB umum
+BEST_KNOWN = {
+    "ulysses16": 6859, "ulysses22": 7013, "att48": 10628, "eil51": 426, "berlin52": 7542,
+    "st70": 675, "eil76": 538, "pr76": 108159, "rat99": 1211, "kroA100": 21282, "kroB100": 22141,
+    "kroC100": 20749, "kroD100": 21294, "kroE100": 22068, "rd100": 7910, "eil101": 629, "lin105": 14379,
+    "ch130": 6110, "ch150": 6528, "kroA150": 26524, "kroA200": 29368, "a280": 2579, "pcb442": 50778,
+}
+
+# Parameter default setiap solver, sama dengan nilai awal di UI
+SOLVERS = {
+    "ga": dict(pop_size=50, elite_size=10, mutation_rate=0.01, generations=100),
+    "ga_2opt": dict(pop_size=50, elite_size=10, mutation_rate=0.01, generations=100),
+    "aco": dict(n_ants=10, n_best=5, n_iterations=100, decay=0.5, alpha=1.0, beta=2.0),
+    "pso": dict(num_particles=10, num_iterations=100, inertia_weight=0.5, c1=1.5, c2=1.5),
+    "bpso": dict(num_particles=10, num_iterations=100, inertia_weight=0.5, c1=1.5, c2=1.5),
+    "rkpso": dict(num_particles=10, num_iterations=100, inertia_weight=0.5, c1=1.5, c2=1.5),
+    "lk": dict(time_limit=5.0),
+}
+
+_SOLVER_CLASSES = {
+    "ga": GA_TSP, "ga_2opt": GA_2opt_TSP, "aco": AntColony, "pso": PSO_TSP,
+    "bpso": BPSO_TSP, "rkpso": RandomKeyPSO_TSP, "lk": LK_TSP,
+}
+
+
+def evaluations(solver, params):
+    """
+    Jumlah evaluasi rute lengkap yang dilakukan solver (None jika tidak terdefinisi, misalnya LK).
+    """
+    if solver in ("ga", "ga_2opt"):
+        return params["pop_size"] * (params["generations"] + 1)
+    if solver == "aco":
+        return params["n_ants"] * params["n_iterations"]
+    if solver in ("pso", "bpso", "rkpso"):
+        return params["num_particles"] * (params["num_iterations"] + 1)
+    return None
+
+
+def _nint(x):
+    return np.floor(x + 0.5)
+
+
+def _tsplib_geo_radians(coords):
+    # Koordinat GEO TSPLIB berformat DDD.MM (derajat.menit)
+    degrees = np.trunc(coords)
+    minutes = coords - degrees
+    return 3.141592 * (degrees + 5.0 * minutes / 3.0) / 180.0
+
+
+def tsplib_distances(coords, edge_weight_type):
+    """
+    Matriks jarak bulat sesuai definisi TSPLIB untuk EUC_2D, CEIL_2D, ATT dan GEO.
+    """
+    diff = coords[:, None, :] - coords[None, :, :]
+    if edge_weight_type == "EUC_2D":
+        return _nint(np.sqrt((diff ** 2).sum(axis=2)))
+    if edge_weight_type == "CEIL_2D":
+        return np.ceil(np.sqrt((diff ** 2).sum(axis=2)))
+    if edge_weight_type == "ATT":
+        r = np.sqrt((diff ** 2).sum(axis=2) / 10.0)
+        t = _nint(r)
+        return np.where(t < r, t + 1, t)
+    if edge_weight_type == "GEO":
+        rad = _tsplib_geo_radians(coords)
+        lat, lon = rad[:, 0], rad[:, 1]
+        q1 = np.cos(lon[:, None] - lon[None, :])
+        q2 = np.cos(lat[:, None] - lat[None, :])
+        q3 = np.cos(lat[:, None] + lat[None, :])
+        arc = np.arccos(np.clip(0.5 * ((1.0 + q1) * q2 - (1.0 - q1) * q3), -1.0, 1.0))
+        distances = np.trunc(6378.388 * arc + 1.0)
+        np.fill_diagonal(distances, 0.0)
+        return distances
+    raise ValueError(f"EDGE_WEIGHT_TYPE TSPLIB tidak didukung: {edge_weight_type!r}")
+
+
+def read_tsplib(path):
+    """
+    Baca file .tsp (NODE_COORD_SECTION). Mengembalikan (nama, koordinat (n, 2), edge_weight_type).
+    """
+    name = os.path.splitext(os.path.basename(path))[0]
+    edge_weight_type = "EUC_2D"
+    coords = []
+    in_coords = False
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if line == "EOF":
+                break
+            if not line:
+                continue
+            if in_coords:
+                parts = line.split()
+                if not parts[0].lstrip("-").replace(".", "", 1).isdigit():
+                    in_coords = False
+                else:
+                    coords.append((float(parts[1]), float(parts[2])))
+                    continue
+            if line.startswith("NODE_COORD_SECTION"):
+                in_coords = True
+            elif ":" in line:
+                key, value = (part.strip() for part in line.split(":", 1))
+                if key == "NAME":
+                    name = value
+                elif key == "EDGE_WEIGHT_TYPE":
+                    edge_weight_type = value
+    if not coords:
+        raise ValueError(f"{path}: NODE_COORD_SECTION kosong atau tidak ada")
+    return name, np.array(coords), edge_weight_type
+
+
+def tsplib_instance(path):
+    """
+    Instance TSPLIB dalam format matriks (N+2)x(N+2): node pertama menjadi start_point sekaligus end_point,
+    sehingga panjang rute terbuka sama dengan panjang tur tertutup TSPLIB.
+    """
+    name, coords, edge_weight_type = read_tsplib(path)
+    full = tsplib_distances(coords, edge_weight_type)
+    order = np.r_[np.arange(1, len(coords)), 0, 0]
+    return dict(name=name, distances=full[np.ix_(order, order)], best_known=BEST_KNOWN.get(name))
+
+
+def synthetic_jakarta(n, seed=0, clusters=None, metric="haversine"):
+    """
+    Titik sintetis berbentuk seperti data unggahan Excel: beberapa klaster toko di sekitar depot Jakarta.
+    """
+    rng = np.random.default_rng(seed)
+    clusters = clusters or max(1, int(round(np.sqrt(n) / 2)))
+    centers = np.asarray(JAKARTA_DEPOT) + rng.uniform([-0.12, -0.15], [0.12, 0.15], size=(clusters, 2))
+    spread = rng.uniform(0.005, 0.02, size=clusters)
+    which = rng.integers(0, clusters, size=n)
+    points = centers[which] + rng.normal(size=(n, 2)) * spread[which, None]
+    distances = build_distance_matrix(points, JAKARTA_DEPOT, JAKARTA_DEPOT, metric)
+    return dict(name=f"jakarta{n}-s{seed}", distances=distances, best_known=None)
+
+
+def load_instance(spec, metric="haversine"):
+    if spec.startswith("jakarta:"):
+        parts = spec.split(":")
+        return synthetic_jakarta(int(parts[1]), int(parts[2]) if len(parts) > 2 else 0, metric=metric)
+    return tsplib_instance(spec)
+
+
+def _optimize(solver, distances, seed):
+    model = _SOLVER_CLASSES[solver](distances, **SOLVERS[solver], seed=seed)
+    with contextlib.redirect_stdout(io.StringIO()):
+        return model.optimize()
+
+
+def run_solver(solver, distances, seed, memory=True):
+    """
+    Jalankan satu solver. Mengembalikan dict berisi jarak, waktu, evaluasi/detik dan memori puncak.
+    Memori puncak diukur pada run kedua dengan seed yang sama, karena tracemalloc memperlambat waktu.
+    """
+    start = time.perf_counter()
+    route, distance = _optimize(solver, distances, seed)
+    wall_time = time.perf_counter() - start
+
+    peak = None
+    if memory:
+        tracemalloc.start()
+        try:
+            _optimize(solver, distances, seed)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    count = evaluations(solver, SOLVERS[solver])
+    return dict(
+        distance=float(distance),
+        wall_time=wall_time,
+        evaluations=count,
+        evals_per_sec=count / wall_time if count and wall_time > 0 else None,
+        peak_memory_bytes=peak,
+        # BPSO bisa melewatkan waypoint; rute seperti itu tidak dipakai sebagai acuan gap
+        visits_all=sorted(route) == list(range(len(distances) - 2)),
+    )
+
+
+def run_benchmark(instances, solvers, seeds, metric="haversine", memory=True, log=sys.stderr):
+    records = []
+    for spec in instances:
+        instance = load_instance(spec, metric)
+        n = len(instance["distances"]) - 2
+        for solver in solvers:
+            for seed in seeds:
+                result = run_solver(solver, instance["distances"], seed, memory)
+                record = dict(instance=instance["name"], n=n, solver=solver, seed=seed, **result)
+                records.append(record)
+                print(f"{instance['name']:>16} {solver:>8} seed={seed} "
+                      f"{record['distance']:.2f} {record['wall_time']:.2f}s", file=log)
+
+        # Gap dihitung terhadap optimum TSPLIB, atau terhadap rute lengkap terbaik yang ditemukan
+        best_known = instance["best_known"]
+        source = "tsplib"
+        if best_known is None:
+            found = [r["distance"] for r in records if r["instance"] == instance["name"] and r["visits_all"]]
+            best_known = min(found) if found else None
+            source = "best_found"
+        for record in records:
+            if record["instance"] == instance["name"]:
+                record["best_known"] = best_known
+                record["best_known_source"] = source
+                record["gap"] = record["distance"] / best_known - 1 if best_known else None
+    return records
+
+
+def _revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_json(path, records):
+    metadata = dict(revision=_revision(), python=platform.python_version(), numpy=np.__version__,
+                    machine=platform.machine(), timestamp=time.strftime("%Y-%m-%dT%H:%M:%S"))
+    with open(path, "w") as f:
+        json.dump(dict(metadata=metadata, records=records), f, indent=2)
+
+
+def write_csv(path, records):
+    if not records:
+        return
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(records[0]))
+        writer.writeheader()
+        writer.writerows(records)
+
+
+def compare(baseline, candidate, time_tolerance=0.10, gap_tolerance=0.01, out=sys.stdout):
+    """
+    Bandingkan dua hasil benchmark (instance, solver, seed yang sama).
+    Mengembalikan daftar regresi: waktu naik lebih dari time_tolerance, atau jarak naik lebih dari gap_tolerance.
+    """
+    key = lambda r: (r["instance"], r["solver"], r["seed"])
+    old = {key(r): r for r in baseline["records"]}
+    regressions = []
+    print(f"{'instance':>16} {'solver':>8} {'seed':>4} {'time old':>9} {'time new':>9} {'ratio':>6} "
+          f"{'dist old':>10} {'dist new':>10}", file=out)
+    for record in candidate["records"]:
+        before = old.get(key(record))
+        if before is None:
+            continue
+        ratio = record["wall_time"] / before["wall_time"] if before["wall_time"] > 0 else float("inf")
+        slower = ratio > 1 + time_tolerance
+        worse = record["distance"] > before["distance"] * (1 + gap_tolerance)
+        flag = " ".join(name for name, bad in (("SLOWER", slower), ("WORSE", worse)) if bad)
+        print(f"{record['instance']:>16} {record['solver']:>8} {record['seed']:>4} {before['wall_time']:>9.3f} "
+              f"{record['wall_time']:>9.3f} {ratio:>6.2f} {before['distance']:>10.2f} {record['distance']:>10.2f} "
+              f"{flag}", file=out)
+        if flag:
+            regressions.append(dict(key=key(record), time_ratio=ratio, slower=slower, worse=worse))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark solver TSP")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="jalankan benchmark")
+    run.add_argument("instances", nargs="+", help="file TSPLIB .tsp atau jakarta:<n>[:<seed>]")
+    run.add_argument("--solvers", nargs="+", default=list(SOLVERS), choices=list(SOLVERS))
+    run.add_argument("--seeds", nargs="+", type=int, default=[0])
+    run.add_argument("--metric", default="haversine", help="metric jarak untuk instance sintetis")
+    run.add_argument("--no-memory", action="store_true", help="lewati run kedua untuk mengukur memori puncak")
+    run.add_argument("--json", help="simpan hasil ke file JSON")
+    run.add_argument("--csv", help="simpan hasil ke file CSV")
+
+    cmp = commands.add_parser("compare", help="bandingkan dua file JSON hasil benchmark")
+    cmp.add_argument("baseline")
+    cmp.add_argument("candidate")
+    cmp.add_argument("--time-tolerance", type=float, default=0.10)
+    cmp.add_argument("--gap-tolerance", type=float, default=0.01)
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        records = run_benchmark(args.instances, args.solvers, args.seeds, args.metric, not args.no_memory)
+        if args.json:
+            write_json(args.json, records)
+        if args.csv:
+            write_csv(args.csv, records)
+        if not args.json and not args.csv:
+            json.dump(records, sys.stdout, indent=2)
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+    regressions = compare(baseline, candidate, args.time_tolerance, args.gap_tolerance)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
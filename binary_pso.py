@@ -1,101 +1,123 @@
 import numpy as np
-import random
-from geopy.distance import geodesic
-
-
-# Fungsi untuk menghitung jarak antara dua titik menggunakan geodesic (latitude, longitude)
-def distance_between_points(p1, p2):
-    return geodesic(p1, p2).kilometers
-
-
-# Fungsi untuk menghitung total jarak dalam rute
-def total_distance(route, start_point, end_point):
-    """
-    Menghitung total jarak rute berdasarkan waypoint yang dipilih.
-    """
-    distance = distance_between_points(start_point, route[0])
-    for i in range(len(route) - 1):
-        distance += distance_between_points(route[i], route[i + 1])
-    distance += distance_between_points(route[-1], end_point)
-    return distance
+from distance_matrix import num_waypoints, route_length
+from local_search import polish_route
+from random_utils import make_rng
+from anytime import SearchMonitor
 
 
 # Kelas Binary PSO (BPSO) untuk TSP
 class BPSO_TSP:
-    def __init__(self, waypoints, start_point, end_point, num_particles, num_iterations, inertia_weight, c1, c2):
-        self.waypoints = waypoints
-        self.start_point = start_point
-        self.end_point = end_point
+    def __init__(self, distances, num_particles, num_iterations, inertia_weight, c1, c2, local_search=None, seed=None,
+                 time_limit=None, patience=None, target_distance=None, callback=None):
+        # distances: matriks (N+2)x(N+2) dari distance_matrix.build_distance_matrix
+        self.distances = distances
         self.num_particles = num_particles
         self.num_iterations = num_iterations
         self.inertia_weight = inertia_weight
         self.c1 = c1  # Koefisien kognitif
         self.c2 = c2  # Koefisien sosial
+        # Polishing opsional dari local_search: None, "2opt", "or_opt", "3opt" atau "vnd"
+        self.local_search = local_search
+        self.rng = make_rng(seed)
+        # Berhenti lebih awal (batas waktu, stagnasi, target jarak) dan akses rute terbaik sementara
+        self.monitor = SearchMonitor(time_limit, patience, target_distance, callback)
 
-        self.num_waypoints = len(self.waypoints)
+        self.num_waypoints = num_waypoints(distances)
 
-        # Inisialisasi posisi dan kecepatan partikel
-        self.particles = [self.initialize_particle() for _ in range(num_particles)]
-        self.velocities = [self.initialize_velocity() for _ in range(num_particles)]
+        # Inisialisasi posisi dan kecepatan seluruh swarm sebagai array (P, N)
+        self.particles = self.initialize_particle()
+        self.velocities = self.initialize_velocity()
 
-        # Inisialisasi personal best dan global best
-        self.p_best = self.particles[:]
-        self.g_best = min(self.particles, key=lambda p: self.route_distance(p))
+        # Inisialisasi personal best dan global best, skor disimpan agar tidak dihitung ulang
+        self.p_best = self.particles.copy()
+        self.p_best_fitness = self.swarm_distances(self.particles)
+        best = int(np.argmin(self.p_best_fitness))
+        self.g_best = self.p_best[best].copy()
+        self.g_best_fitness = float(self.p_best_fitness[best])
 
     def initialize_particle(self):
         """
         Inisialisasi partikel sebagai array biner (0 atau 1).
         """
-        return np.random.randint(2, size=self.num_waypoints)
+        return self.rng.integers(2, size=(self.num_particles, self.num_waypoints))
 
     def initialize_velocity(self):
         """
         Inisialisasi kecepatan sebagai array float dalam rentang [0, 1].
         """
-        return np.random.random(self.num_waypoints)
+        return self.rng.random((self.num_particles, self.num_waypoints))
+
+    def selected_route(self, particle):
+        """
+        Indeks waypoint yang dipilih partikel (bit 1), atau semua waypoint jika tidak ada yang dipilih.
+        """
+        selected_indices = np.flatnonzero(particle == 1)
+        if len(selected_indices) == 0:
+            selected_indices = np.arange(self.num_waypoints)
+        return selected_indices.tolist()
 
     def route_distance(self, particle):
         """
         Hitung jarak total untuk rute berdasarkan partikel (binary).
         Pastikan semua waypoint digunakan.
         """
-        selected_indices = [i for i in range(len(particle)) if particle[i] == 1]
+        return route_length(self.distances, self.selected_route(particle))
 
-        # Jika tidak ada waypoint yang dipilih, anggap semua waypoint
-        if len(selected_indices) == 0:
-            selected_indices = list(range(self.num_waypoints))
+    def swarm_distances(self, particles):
+        """
+        Jarak rute semua partikel sekaligus: setiap waypoint terpilih dihubungkan ke waypoint
+        terpilih sebelumnya (dicari dengan maximum.accumulate), atau ke start_point jika tidak ada.
+        """
+        n = self.num_waypoints
+        start, end = n, n + 1
+        selected = particles == 1
+        index = np.where(selected, np.arange(n), -1)
+        last = np.maximum.accumulate(index, axis=1) if n else np.full((len(particles), 1), -1)
+        previous = np.concatenate([np.full((len(particles), 1), -1), last[:, :-1]], axis=1)[:, :n]
+        previous = np.where(previous < 0, start, previous)
+        legs = np.where(selected, self.distances[previous, np.arange(n)], 0.0).sum(axis=1)
+        final = last[:, -1]
+        distances = legs + self.distances[np.where(final < 0, start, final), end]
 
-        selected_waypoints = [self.waypoints[idx] for idx in selected_indices]
-        return total_distance(selected_waypoints, self.start_point, self.end_point)
+        # Jika tidak ada waypoint yang dipilih, anggap semua waypoint
+        empty = final < 0
+        if empty.any():
+            distances[empty] = route_length(self.distances, np.arange(n))
+        return distances
 
-    def update_velocity(self, particle, velocity, p_best, g_best):
+    def update_velocity(self):
         """
-        Update kecepatan partikel berdasarkan rumus PSO.
+        Update kecepatan seluruh swarm berdasarkan rumus PSO.
         """
-        r1, r2 = random.random(), random.random()
+        r1 = self.rng.random((self.num_particles, 1))
+        r2 = self.rng.random((self.num_particles, 1))
 
         # Update kecepatan
         new_velocity = (
-            self.inertia_weight * velocity
-            + self.c1 * r1 * (p_best - particle)
-            + self.c2 * r2 * (g_best - particle)
+            self.inertia_weight * self.velocities
+            + self.c1 * r1 * (self.p_best - self.particles)
+            + self.c2 * r2 * (self.g_best - self.particles)
         )
-        return np.clip(new_velocity, 0, 1)
+        self.velocities = np.clip(new_velocity, 0, 1)
+        return self.velocities
 
-    def update_position(self, particle, velocity):
+    def update_position(self):
         """
-        Update posisi partikel (binary) berdasarkan probabilitas sigmoid dari kecepatan.
+        Update posisi seluruh swarm (binary) berdasarkan probabilitas sigmoid dari kecepatan,
+        dengan satu undian rng.random((P, N)).
         """
         # sigmoid = 1 / (1 + np.exp(-velocity))
         k = 2  # Faktor pengali untuk sigmoid
-        sigmoid = 1 / (1 + np.exp(-k * velocity))
-        new_particle = np.array([1 if random.random() < sigmoid[i] else 0 for i in range(len(particle))])
+        sigmoid = 1 / (1 + np.exp(-k * self.velocities))
+        new_particles = (self.rng.random(sigmoid.shape) < sigmoid).astype(self.particles.dtype)
 
         # Pastikan minimal satu waypoint dipilih
-        if np.sum(new_particle) == 0:
-            new_particle[random.randint(0, len(new_particle) - 1)] = 1
+        empty = np.flatnonzero(new_particles.sum(axis=1) == 0)
+        if len(empty) and self.num_waypoints:
+            new_particles[empty, self.rng.integers(0, self.num_waypoints, size=len(empty))] = 1
 
-        return new_particle
+        self.particles = new_particles
+        return self.particles
 
     def optimize(self):
         """
@@ -103,32 +125,38 @@ class BPSO_TSP:
         """
         best_distance = float('inf')
         best_route = None
+        monitor = self.monitor
+        monitor.start(self.num_iterations)
 
         for iteration in range(self.num_iterations):
-            for i in range(self.num_particles):
-                # Update kecepatan dan posisi partikel
-                self.velocities[i] = self.update_velocity(
-                    self.particles[i], self.velocities[i], self.p_best[i], self.g_best
-                )
-                self.particles[i] = self.update_position(self.particles[i], self.velocities[i])
+            # Update kecepatan dan posisi seluruh partikel
+            self.update_velocity()
+            self.update_position()
 
-                # Update personal best jika solusi baru lebih baik
-                if self.route_distance(self.particles[i]) < self.route_distance(self.p_best[i]):
-                    self.p_best[i] = self.particles[i]
+            # Update personal best jika solusi baru lebih baik (satu evaluasi per partikel)
+            fitness = self.swarm_distances(self.particles)
+            improved = fitness < self.p_best_fitness
+            self.p_best[improved] = self.particles[improved]
+            self.p_best_fitness[improved] = fitness[improved]
 
-            # Update global best
-            self.g_best = min(self.p_best, key=lambda p: self.route_distance(p))
-            g_best_distance = self.route_distance(self.g_best)
+            # Update global best dari skor p_best yang disimpan
+            best = int(np.argmin(self.p_best_fitness))
+            self.g_best = self.p_best[best].copy()
+            self.g_best_fitness = float(self.p_best_fitness[best])
 
-            if g_best_distance < best_distance:
-                best_distance = g_best_distance
+            if self.g_best_fitness < best_distance:
+                best_distance = self.g_best_fitness
 
                 # Simpan rute terbaik sebagai indeks waypoint
-                best_route = [i for i in range(len(self.g_best)) if self.g_best[i] == 1]
+                best_route = self.selected_route(self.g_best)
+
+            if monitor.step(best_route, best_distance):
+                break
 
-            print(f"Iteration {iteration + 1}/{self.num_iterations}, Best Distance: {best_distance:.2f} km")
+        if self.local_search:
+            best_route, best_distance = polish_route(best_route, self.distances, self.local_search)
 
-        return best_route, best_distance
+        return monitor.finish(best_route, best_distance)
 
 
 
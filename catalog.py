@@ -0,0 +1,138 @@
+# catalog.py
+
+import os
+import tempfile
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from customer import CustomerTable
+from data_utils import WAYPOINT_COLUMNS, read_table, validate_waypoints
+
+DEFAULT_CATALOG_DIR = os.environ.get(
+    "TSP_CATALOG_DIR", os.path.join(os.path.expanduser("~"), ".cache", "tsp_solver", "catalog")
+)
+
+# Baris per row group; statistik min/max per row group dipakai untuk melewati data kota lain
+CATALOG_ROW_GROUP_SIZE = 16384
+
+CATALOG_SCHEMA = pa.schema([
+    ("Kota", pa.string()),
+    ("Kelurahan", pa.string()),
+    ("Nama Toko", pa.string()),
+    ("Latitude", pa.float64()),
+    ("Longitude", pa.float64()),
+])
+
+_DROPPED_ROWS_KEY = b"tsp_solver.dropped_rows"
+
+
+def _predicate(kota=None, kelurahan=None):
+    # Filter dalam format DNF pyarrow, diteruskan ke pembaca Parquet (predicate pushdown)
+    filters = []
+    for column, values in (("Kota", kota), ("Kelurahan", kelurahan)):
+        if values is None:
+            continue
+        if isinstance(values, str):
+            values = [values]
+        filters.append((column, "in", list(values)))
+    return filters or None
+
+
+class StoreCatalog:
+    """
+    Katalog toko dalam satu file Parquet dengan kolom Kota, Kelurahan, Nama Toko, Latitude dan Longitude.
+    Baris diurutkan per kota dan kelurahan sehingga filter kota/kelurahan cukup membaca row group
+    yang relevan; file dibaca secara memory-mapped dan kolom string memakai dictionary encoding.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = pq.ParquetFile(path, memory_map=True)
+
+    @classmethod
+    def from_frame(cls, frame, path):
+        """
+        Validasi frame (validate_waypoints), lalu tulis sebagai katalog di path secara atomik.
+        """
+        waypoints = validate_waypoints(frame)
+        waypoints = waypoints.sort_values(["Kota", "Kelurahan"], kind="stable")
+        metadata = {_DROPPED_ROWS_KEY: str(len(frame) - len(waypoints)).encode()}
+        table = pa.Table.from_pandas(waypoints, schema=CATALOG_SCHEMA, preserve_index=False)
+        table = table.replace_schema_metadata(metadata)
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        os.close(fd)
+        try:
+            pq.write_table(table, tmp_path, row_group_size=CATALOG_ROW_GROUP_SIZE, compression="none",
+                           use_dictionary=["Kota", "Kelurahan"], write_statistics=True)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return cls(path)
+
+    def __len__(self):
+        return self._file.metadata.num_rows
+
+    @property
+    def dropped_rows(self):
+        # Jumlah baris sumber yang dibuang saat validasi impor
+        metadata = self._file.schema_arrow.metadata or {}
+        return int(metadata.get(_DROPPED_ROWS_KEY, b"0"))
+
+    def cities(self):
+        return self.distinct("Kota")
+
+    def kelurahan(self, kota=None):
+        return self.distinct("Kelurahan", kota=kota)
+
+    def distinct(self, column, kota=None):
+        table = self.read(kota=kota, columns=[column])
+        return sorted(pc.unique(table.column(column)).to_pylist())
+
+    def read(self, kota=None, kelurahan=None, columns=None):
+        """
+        Baca katalog sebagai pyarrow.Table; kota dan kelurahan (satu nilai atau daftar) menjadi
+        predicate yang diteruskan ke Parquet, columns membatasi kolom yang dibaca.
+        """
+        return pq.read_table(self.path, columns=columns, filters=_predicate(kota, kelurahan), memory_map=True)
+
+    def load_frame(self, kota=None, kelurahan=None):
+        return self.read(kota, kelurahan).to_pandas()
+
+    def load_table(self, kota=None, kelurahan=None):
+        table = self.read(kota, kelurahan)
+        return CustomerTable.from_columns(*(table.column(column).to_numpy() for column in WAYPOINT_COLUMNS))
+
+
+class CatalogStore:
+    """
+    Direktori katalog Parquet dengan kunci hash isi file sumber (data_utils.file_digest):
+    file sumber hanya di-parse sekali, upload berikutnya dengan isi sama langsung membuka katalognya.
+    """
+
+    def __init__(self, catalog_dir=DEFAULT_CATALOG_DIR):
+        self.catalog_dir = catalog_dir
+        os.makedirs(catalog_dir, exist_ok=True)
+
+    def path(self, digest):
+        return os.path.join(self.catalog_dir, f"{digest}.parquet")
+
+    def get(self, digest):
+        path = self.path(digest)
+        if os.path.exists(path):
+            return StoreCatalog(path)
+        return None
+
+    def get_or_import(self, digest, source, file_type=None):
+        """
+        Buka katalog untuk digest, atau impor source (path atau file-like; lihat data_utils.read_table).
+        """
+        catalog = self.get(digest)
+        if catalog is None:
+            catalog = StoreCatalog.from_frame(read_table(source, file_type), self.path(digest))
+        return catalog
@@ -0,0 +1,130 @@
+# comparison.py
+
+import multiprocessing
+import os
+import queue
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+from shared_array import attach_shared_array, create_shared_array
+from solver_runner import ProgressEvent
+
+# Selang minimum (detik) antar event progres yang dikirim setiap worker
+PROGRESS_INTERVAL = 0.2
+
+# Matriks jarak, queue progres dan flag batal di proses worker, di-attach sekali lewat initializer
+_worker_shm = None
+_worker_distances = None
+_worker_events = None
+_worker_cancel = None
+
+
+def _attach_worker(spec, events, cancel):
+    global _worker_shm, _worker_distances, _worker_events, _worker_cancel
+    _worker_shm, _worker_distances = attach_shared_array(spec)
+    _worker_events = events
+    _worker_cancel = cancel
+
+
+def _run_solver(name, solver_class, params):
+    # Jalankan satu solver sampai selesai; kurva konvergensi lengkap ikut dikembalikan bersama hasil
+    solver = solver_class(_worker_distances, **params)
+    history = []
+    last_sent = -PROGRESS_INTERVAL
+
+    def send(monitor):
+        _worker_events.put((name, ProgressEvent(monitor.iteration, monitor.max_iterations, monitor.best_distance,
+                                                monitor.elapsed)))
+
+    def callback(monitor):
+        nonlocal last_sent
+        history.append((monitor.iteration, monitor.elapsed, monitor.best_distance))
+        if monitor.elapsed - last_sent >= PROGRESS_INTERVAL:
+            last_sent = monitor.elapsed
+            send(monitor)
+        if _worker_cancel.is_set():
+            monitor.stop()
+
+    solver.monitor.callback = callback
+    start = time.perf_counter()
+    route, distance = solver.optimize()
+    wall_time = time.perf_counter() - start
+    send(solver.monitor)
+    return dict(route=list(route), distance=float(distance), wall_time=wall_time,
+                stop_reason=solver.monitor.stop_reason, iterations=solver.monitor.iteration, history=history)
+
+
+class ComparisonRun:
+    """
+    Jalankan beberapa solver sekaligus pada satu matriks jarak, masing-masing di proses worker sendiri,
+    sehingga total waktu mendekati waktu solver paling lambat, bukan jumlah semuanya.
+
+    solvers: dict nama -> (kelas solver, kwargs selain distances). Matriks jarak dibagikan lewat
+    shared memory. Pool proses dikelola oleh satu thread di executor (lihat solver_runner),
+    sehingga UI tetap responsif: poll() mengembalikan progres terbaru per solver, cancel()
+    menghentikan semua solver setelah iterasi yang sedang berjalan, dan result() mengembalikan
+    dict nama -> hasil (route, distance, wall_time, stop_reason, iterations, history).
+    Solver paralel sebaiknya dijalankan dengan satu proses (num_islands=1, n_workers=1)
+    karena setiap solver sudah mendapat prosesnya sendiri.
+    """
+
+    def __init__(self, distances, solvers, executor, max_workers=None):
+        self.distances = distances
+        self.solvers = solvers
+        self.max_workers = max_workers or min(len(solvers), os.cpu_count() or 1)
+        context = multiprocessing.get_context()
+        self._events = context.Queue()
+        self._cancel = context.Event()
+        # Event progres terakhir per solver, diisi oleh thread pengelola
+        self.progress = {name: None for name in solvers}
+        self.finished_at = None
+        self.future = executor.submit(self._run)
+
+    def _drain(self):
+        while True:
+            try:
+                name, event = self._events.get_nowait()
+            except queue.Empty:
+                return
+            self.progress[name] = event
+
+    def _run(self):
+        shm, spec = create_shared_array(np.ascontiguousarray(self.distances, dtype=np.float64))
+        try:
+            with ProcessPoolExecutor(max_workers=self.max_workers, initializer=_attach_worker,
+                                     initargs=(spec, self._events, self._cancel)) as executor:
+                futures = {executor.submit(_run_solver, name, solver_class, params): name
+                           for name, (solver_class, params) in self.solvers.items()}
+                pending = set(futures)
+                # Queue terus dikosongkan selama menunggu agar worker tidak tertahan oleh pipe yang penuh
+                while pending:
+                    _, pending = wait(pending, timeout=PROGRESS_INTERVAL, return_when=FIRST_COMPLETED)
+                    self._drain()
+                results = {futures[future]: future.result() for future in futures}
+            self._drain()
+            return {name: results[name] for name in self.solvers}
+        finally:
+            shm.close()
+            shm.unlink()
+            self.finished_at = time.time()
+
+    def poll(self):
+        """
+        Progres terbaru per solver: dict nama -> ProgressEvent (None jika belum ada).
+        """
+        return dict(self.progress)
+
+    def cancel(self):
+        self._cancel.set()
+
+    @property
+    def running(self):
+        return self.future.running()
+
+    def done(self):
+        return self.future.done()
+
+    def result(self):
+        return self.future.result()
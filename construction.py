@@ -0,0 +1,297 @@
+# construction.py
+
+import numpy as np
+from scipy.sparse.csgraph import minimum_spanning_tree
+
+from distance_matrix import nearest_neighbors, num_waypoints, population_lengths
+
+# Heuristik konstruksi rute awal; "hilbert" membutuhkan koordinat waypoint
+CONSTRUCTION_METHODS = ("nearest_neighbor", "greedy", "christofides", "hilbert")
+
+# Jumlah tetangga per waypoint yang menjadi kandidat edge greedy
+GREEDY_NEIGHBORS = 10
+
+# Resolusi grid kurva Hilbert (2**HILBERT_ORDER sel per sisi)
+HILBERT_ORDER = 16
+
+
+def as_routes(routes, n):
+    """
+    Validasi rute awal untuk solver: array (M, N) yang setiap barisnya permutasi 0..N-1.
+    """
+    routes = np.asarray(routes, dtype=np.intp).reshape(-1, n)
+    if not np.array_equal(np.sort(routes, axis=1), np.broadcast_to(np.arange(n), routes.shape)):
+        raise ValueError(f"Setiap rute awal harus berupa permutasi semua {n} waypoint")
+    return routes
+
+
+def seed_population(population, initial_routes):
+    """
+    Ganti baris-baris pertama population (P, N) dengan initial_routes (maksimal P rute); sisanya tetap acak.
+    """
+    if initial_routes is not None:
+        count = min(len(initial_routes), len(population))
+        population[:count] = initial_routes[:count]
+    return population
+
+
+def nearest_neighbor_route(distances):
+    """
+    Rute nearest neighbor dari start_point: selalu ke waypoint terdekat yang belum dikunjungi.
+    """
+    n = num_waypoints(distances)
+    visited = np.zeros(n, dtype=bool)
+    route = np.empty(n, dtype=np.intp)
+    current = n
+    for i in range(n):
+        row = np.where(visited, np.inf, distances[current, :n])
+        current = int(np.argmin(row))
+        route[i] = current
+        visited[current] = True
+    return route
+
+
+def _open_route(cycle, n):
+    # Siklus atas N+2 titik dengan start_point (n) dan end_point (n+1) bersebelahan -> rute terbuka
+    cycle = list(cycle)
+    position = cycle.index(n)
+    step = -1 if cycle[(position + 1) % len(cycle)] == n + 1 else 1
+    return np.array([cycle[(position + step * t) % len(cycle)] for t in range(1, len(cycle) - 1)], dtype=np.intp)
+
+
+def _join_fragments(adjacency, distances):
+    # Gabungkan path-path hasil greedy menjadi satu siklus: dari ujung path saat ini
+    # sambung ke ujung path lain yang terdekat (nearest neighbor antar fragmen)
+    size = len(adjacency)
+    seen = np.zeros(size, dtype=bool)
+    fragments = []
+    for node in range(size):
+        if seen[node] or len(adjacency[node]) == 2:
+            continue
+        path = [node]
+        seen[node] = True
+        previous, current = None, node
+        while True:
+            following = [m for m in adjacency[current] if m != previous]
+            if not following:
+                break
+            previous, current = current, following[0]
+            path.append(current)
+            seen[current] = True
+        fragments.append(path)
+
+    tour = fragments.pop(0)
+    if fragments:
+        heads = np.array([path[0] for path in fragments])
+        tails = np.array([path[-1] for path in fragments])
+        remaining = np.ones(len(fragments), dtype=bool)
+        for _ in range(len(fragments)):
+            row = np.asarray(distances[tour[-1]])
+            to_head = np.where(remaining, row[heads], np.inf)
+            to_tail = np.where(remaining, row[tails], np.inf)
+            best_head, best_tail = int(np.argmin(to_head)), int(np.argmin(to_tail))
+            if to_head[best_head] <= to_tail[best_tail]:
+                tour.extend(fragments[best_head])
+                remaining[best_head] = False
+            else:
+                tour.extend(reversed(fragments[best_tail]))
+                remaining[best_tail] = False
+    return tour
+
+
+def greedy_edge_route(distances, neighbors=None):
+    """
+    Rute greedy edge: edge kandidat (GREEDY_NEIGHBORS tetangga terdekat, atau neighbors (N, k) dari
+    spatial_index) diambil dari yang terpendek selama tidak membuat derajat > 2 atau siklus.
+    Edge start_point - end_point dipasang lebih dulu sehingga hasilnya siklus yang bisa dipotong
+    menjadi rute terbuka. Fragmen yang tersisa disambung dengan nearest neighbor antar ujung.
+    O(Nk log Nk) untuk pemilihan edge.
+    """
+    n = num_waypoints(distances)
+    if n <= 1:
+        return np.arange(n, dtype=np.intp)
+    if neighbors is None:
+        neighbors = nearest_neighbors(distances, GREEDY_NEIGHBORS)
+    k = neighbors.shape[1]
+
+    # Edge antar waypoint (tanpa duplikat) dan edge depot ke k waypoint terdekatnya
+    a = np.repeat(np.arange(n), k)
+    b = neighbors.ravel()
+    depot_edges = [np.argsort(np.asarray(distances[depot, :n]), kind="stable")[:max(k, 1)] for depot in (n, n + 1)]
+    a = np.concatenate([a, np.full(len(depot_edges[0]), n), np.full(len(depot_edges[1]), n + 1)])
+    b = np.concatenate([b, depot_edges[0], depot_edges[1]])
+    edges = np.unique(np.column_stack([np.minimum(a, b), np.maximum(a, b)]), axis=0)
+    lengths = np.asarray(distances)[edges[:, 0], edges[:, 1]]
+    edges = edges[np.argsort(lengths, kind="stable")]
+
+    parent = list(range(n + 2))
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    degree = [0] * (n + 2)
+    adjacency = [[] for _ in range(n + 2)]
+
+    def link(u, v):
+        degree[u] += 1
+        degree[v] += 1
+        adjacency[u].append(v)
+        adjacency[v].append(u)
+        parent[find(u)] = find(v)
+
+    link(n, n + 1)
+    added = 1
+    for u, v in edges.tolist():
+        if degree[u] < 2 and degree[v] < 2 and find(u) != find(v):
+            link(u, v)
+            added += 1
+            if added == n + 1:
+                break
+
+    return _open_route(_join_fragments(adjacency, distances), n)
+
+
+def _greedy_matching(vertices, distances):
+    # Matching greedy (bukan minimum weight perfect matching): pasangkan setiap titik ganjil
+    # dengan titik ganjil terdekat yang belum berpasangan, mulai dari pasangan terdekat
+    sub = np.array(np.asarray(distances)[np.ix_(vertices, vertices)], dtype=np.float64)
+    np.fill_diagonal(sub, np.inf)
+    matched = np.zeros(len(vertices), dtype=bool)
+    pairs = []
+    for i in np.argsort(sub.min(axis=1), kind="stable"):
+        if matched[i]:
+            continue
+        row = np.where(matched, np.inf, sub[i])
+        j = int(np.argmin(row))
+        matched[i] = matched[j] = True
+        pairs.append((vertices[i], vertices[j]))
+    return pairs
+
+
+def _euler_circuit(adjacency, start):
+    # Algoritma Hierholzer untuk multigraf dalam bentuk list adjacency (edge ganda boleh)
+    adjacency = [list(neighbors) for neighbors in adjacency]
+    stack, circuit = [start], []
+    while stack:
+        node = stack[-1]
+        if adjacency[node]:
+            following = adjacency[node].pop()
+            adjacency[following].remove(node)
+            stack.append(following)
+        else:
+            circuit.append(stack.pop())
+    return circuit
+
+
+def christofides_route(distances):
+    """
+    Christofides versi ringan: MST (dengan edge start_point - end_point dipaksa masuk), matching greedy
+    pada titik berderajat ganjil, sirkuit Euler, lalu shortcut titik yang sudah dikunjungi.
+    Arah rute dipilih yang lebih pendek dari start_point ke end_point.
+    """
+    n = num_waypoints(distances)
+    if n <= 1:
+        return np.arange(n, dtype=np.intp)
+    # csgraph menganggap bobot 0 sebagai tidak ada edge, jadi semua bobot digeser sedikit
+    weights = np.array(distances[:n + 2, :n + 2], dtype=np.float64) + 1e-9
+    weights[n, n + 1] = weights[n + 1, n] = 1e-12
+    np.fill_diagonal(weights, 0)
+    tree = minimum_spanning_tree(weights).tocoo()
+
+    adjacency = [[] for _ in range(n + 2)]
+    for u, v in zip(tree.row.tolist(), tree.col.tolist()):
+        adjacency[u].append(v)
+        adjacency[v].append(u)
+    odd = np.array([node for node in range(n + 2) if len(adjacency[node]) % 2 == 1], dtype=np.intp)
+    for u, v in _greedy_matching(odd, distances):
+        adjacency[u].append(v)
+        adjacency[v].append(u)
+
+    seen = np.zeros(n + 2, dtype=bool)
+    order = []
+    for node in _euler_circuit(adjacency, n):
+        if not seen[node]:
+            seen[node] = True
+            order.append(node)
+    route = np.array([node for node in order if node < n], dtype=np.intp)
+    routes = np.stack([route, route[::-1]])
+    return routes[int(np.argmin(population_lengths(distances, routes)))]
+
+
+def hilbert_index(x, y, order=HILBERT_ORDER):
+    """
+    Indeks kurva Hilbert untuk sel grid integer (x, y) dalam [0, 2**order), divektorisasi.
+    """
+    x = np.array(x, dtype=np.int64)
+    y = np.array(y, dtype=np.int64)
+    side = 1 << order
+    d = np.zeros_like(x)
+    s = side >> 1
+    while s > 0:
+        rx = (x & s) > 0
+        ry = (y & s) > 0
+        d += s * s * ((3 * rx.astype(np.int64)) ^ ry.astype(np.int64))
+        # Rotasi kuadran agar kurva tetap bersambung
+        flip = ~ry & rx
+        x = np.where(flip, side - 1 - x, x)
+        y = np.where(flip, side - 1 - y, y)
+        x, y = np.where(~ry, y, x), np.where(~ry, x, y)
+        s >>= 1
+    return d
+
+
+def hilbert_route(coordinates, distances=None, order=HILBERT_ORDER):
+    """
+    Urutan waypoint menurut kurva Hilbert atas koordinat (lat, lon), O(N log N).
+    Jika distances diberikan, titik potong dan arah urutan (sebagai siklus) dipilih
+    agar sambungan ke start_point dan end_point paling pendek.
+    """
+    points = np.asarray(coordinates, dtype=np.float64).reshape(-1, 2)
+    n = len(points)
+    if n <= 1:
+        return np.arange(n, dtype=np.intp)
+    # Proyeksi equirectangular agar skala lintang dan bujur sebanding, lalu dipetakan ke grid persegi
+    lat, lon = points[:, 0], points[:, 1]
+    x = lon * np.cos(np.radians(lat.mean()))
+    y = lat
+    span = max(x.max() - x.min(), y.max() - y.min(), 1e-12)
+    cells = (1 << order) - 1
+    gx = np.round((x - x.min()) / span * cells).astype(np.int64)
+    gy = np.round((y - y.min()) / span * cells).astype(np.int64)
+    route = np.argsort(hilbert_index(gx, gy, order), kind="stable").astype(np.intp)
+    if distances is None:
+        return route
+
+    best_cost, best_route = np.inf, route
+    for candidate in (route, route[::-1]):
+        # Memotong siklus di antara candidate[i-1] dan candidate[i]
+        cost = (np.asarray(distances[n, candidate]) + np.asarray(distances[np.roll(candidate, 1), n + 1])
+                - np.asarray(distances[np.roll(candidate, 1), candidate]))
+        cut = int(np.argmin(cost))
+        if cost[cut] < best_cost:
+            best_cost, best_route = cost[cut], np.roll(candidate, -cut)
+    return best_route
+
+
+def construct_routes(distances, methods=CONSTRUCTION_METHODS, coordinates=None, neighbors=None):
+    """
+    Rute awal dari setiap heuristik di methods sebagai array (M, N), untuk initial_routes solver.
+    "hilbert" dilewati jika coordinates tidak diberikan.
+    """
+    builders = {
+        "nearest_neighbor": lambda: nearest_neighbor_route(distances),
+        "greedy": lambda: greedy_edge_route(distances, neighbors),
+        "christofides": lambda: christofides_route(distances),
+        "hilbert": lambda: hilbert_route(coordinates, distances),
+    }
+    routes = []
+    for method in methods:
+        if method not in builders:
+            raise ValueError(f"Heuristik konstruksi tidak dikenal: {method!r}, pilih salah satu dari {CONSTRUCTION_METHODS}")
+        if method == "hilbert" and coordinates is None:
+            continue
+        routes.append(builders[method]())
+    return np.array(routes, dtype=np.intp).reshape(len(routes), num_waypoints(distances))
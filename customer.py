@@ -1,12 +1,39 @@
 # customer.py
 
+import numpy as np
+import pandas as pd
+
+
 class Customer:
-    def __init__(self, kota, kelurahan, name, latitude, longitude):
-        self.kota = kota
-        self.kelurahan = kelurahan
-        self.name = name
-        self.latitude = latitude
-        self.longitude = longitude
+    """
+    Tampilan satu baris CustomerTable; tidak menyalin data, atribut dibaca dari array tabel.
+    """
+
+    __slots__ = ("table", "index")
+
+    def __init__(self, table, index):
+        self.table = table
+        self.index = index
+
+    @property
+    def kota(self):
+        return self.table.kota_categories[self.table.kota_codes[self.index]]
+
+    @property
+    def kelurahan(self):
+        return self.table.kelurahan_categories[self.table.kelurahan_codes[self.index]]
+
+    @property
+    def name(self):
+        return self.table.names[self.index]
+
+    @property
+    def latitude(self):
+        return float(self.table.coordinates[self.index, 0])
+
+    @property
+    def longitude(self):
+        return float(self.table.coordinates[self.index, 1])
 
     def __repr__(self):
         return (f"Customer(kota={self.kota}, kelurahan={self.kelurahan}, "
@@ -20,3 +47,99 @@ class Customer:
             "latitude": self.latitude,
             "longitude": self.longitude
         }
+
+
+def _factorize(values):
+    # Kode kategori int32 dan daftar kategori terurut
+    codes, categories = pd.factorize(np.asarray(values, dtype=object), sort=True)
+    return codes.astype(np.int32), np.asarray(categories, dtype=object)
+
+
+class CustomerTable:
+    """
+    Data customer sebagai struct-of-arrays: koordinat float64 (N, 2) yang bersebelahan di memori,
+    kota dan kelurahan sebagai kode kategori int32, dan nama toko sebagai array object.
+    coordinates bisa langsung diberikan ke distance_matrix tanpa konversi; indeks baris sama
+    dengan indeks waypoint pada matriks jarak. Array dibuat read-only agar tabel aman dipakai bersama.
+    """
+
+    def __init__(self, kota_codes, kota_categories, kelurahan_codes, kelurahan_categories, names, coordinates):
+        self.kota_codes = kota_codes
+        self.kota_categories = kota_categories
+        self.kelurahan_codes = kelurahan_codes
+        self.kelurahan_categories = kelurahan_categories
+        self.names = names
+        self.coordinates = np.ascontiguousarray(coordinates, dtype=np.float64).reshape(-1, 2)
+        for array in (self.kota_codes, self.kota_categories, self.kelurahan_codes, self.kelurahan_categories,
+                      self.names, self.coordinates):
+            array.flags.writeable = False
+
+    @classmethod
+    def from_columns(cls, kota, kelurahan, names, latitude, longitude):
+        kota_codes, kota_categories = _factorize(kota)
+        kelurahan_codes, kelurahan_categories = _factorize(kelurahan)
+        coordinates = np.column_stack([np.asarray(latitude, dtype=np.float64),
+                                       np.asarray(longitude, dtype=np.float64)])
+        return cls(kota_codes, kota_categories, kelurahan_codes, kelurahan_categories,
+                   np.asarray(names, dtype=object), coordinates)
+
+    def __len__(self):
+        return len(self.coordinates)
+
+    def __getitem__(self, index):
+        if not -len(self) <= index < len(self):
+            raise IndexError(f"Indeks customer di luar jangkauan: {index}")
+        return Customer(self, index % len(self))
+
+    def __iter__(self):
+        return (Customer(self, i) for i in range(len(self)))
+
+    @property
+    def latitude(self):
+        return self.coordinates[:, 0]
+
+    @property
+    def longitude(self):
+        return self.coordinates[:, 1]
+
+    @property
+    def kota(self):
+        return self.kota_categories[self.kota_codes]
+
+    @property
+    def kelurahan(self):
+        return self.kelurahan_categories[self.kelurahan_codes]
+
+    @staticmethod
+    def _match(codes, categories, values):
+        if isinstance(values, str):
+            values = [values]
+        wanted = np.flatnonzero(np.isin(categories, np.asarray(list(values), dtype=object)))
+        return np.isin(codes, wanted)
+
+    def mask(self, kota=None, kelurahan=None):
+        """
+        Mask boolean baris yang kota-nya ada di kota dan kelurahan-nya ada di kelurahan
+        (masing-masing satu nilai atau daftar nilai; None berarti tanpa filter).
+        """
+        mask = np.ones(len(self), dtype=bool)
+        if kota is not None:
+            mask &= self._match(self.kota_codes, self.kota_categories, kota)
+        if kelurahan is not None:
+            mask &= self._match(self.kelurahan_codes, self.kelurahan_categories, kelurahan)
+        return mask
+
+    def take(self, indices):
+        """
+        Tabel baru berisi baris indices (indeks atau mask boolean), dengan daftar kategori yang sama.
+        """
+        return CustomerTable(self.kota_codes[indices], self.kota_categories,
+                             self.kelurahan_codes[indices], self.kelurahan_categories,
+                             self.names[indices], self.coordinates[indices])
+
+    def filter(self, kota=None, kelurahan=None):
+        return self.take(self.mask(kota, kelurahan))
+
+    def to_frame(self):
+        return pd.DataFrame({"kota": self.kota, "kelurahan": self.kelurahan, "name": self.names,
+                             "latitude": self.latitude, "longitude": self.longitude})
@@ -1,10 +1,107 @@
+import hashlib
+import os
 
-
+import openpyxl
 import pandas as pd
-from customer import Customer
+from customer import CustomerTable
 
-def read_waypoints_from_excel(file_path):
-    df = pd.read_excel(file_path)
-    df = df[['Kota', 'Kelurahan', 'Nama Toko', 'Latitude', 'Longitude']].dropna()
-    waypoints = [Customer(row['Kota'], row['Kelurahan'], row['Nama Toko'], row['Latitude'], row['Longitude']) for _, row in df.iterrows()]
+# Kolom wajib data lokasi; baris dengan nilai kosong (atau koordinat bukan angka) dilewati
+WAYPOINT_COLUMNS = ["Kota", "Kelurahan", "Nama Toko", "Latitude", "Longitude"]
+WAYPOINT_FILE_TYPES = ("xlsx", "csv", "parquet")
+
+
+def file_digest(data):
+    """
+    Hash isi file (bytes), dipakai sebagai kunci cache hasil parsing upload.
+    """
+    return hashlib.sha256(data).hexdigest()
+
+
+def _read_xlsx(source):
+    # Mode read-only openpyxl membaca sheet sebagai stream baris, tanpa membangun model sel lengkap
+    workbook = openpyxl.load_workbook(source, read_only=True, data_only=True)
+    try:
+        # Sheet pertama, sama seperti pd.read_excel
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, ())
+        records = [row for row in rows if any(value is not None for value in row)]
+    finally:
+        workbook.close()
+    return pd.DataFrame.from_records(records, columns=header)
+
+
+def read_table(source, file_type=None):
+    """
+    Baca seluruh tabel dari path atau file-like (misalnya upload Streamlit) dalam satu kali parsing.
+    file_type "xlsx", "csv" atau "parquet"; jika None ditebak dari ekstensi nama file.
+    """
+    if file_type is None:
+        name = source if isinstance(source, (str, os.PathLike)) else getattr(source, "name", "")
+        file_type = os.path.splitext(str(name))[1].lstrip(".").lower() or "xlsx"
+    if file_type not in WAYPOINT_FILE_TYPES:
+        raise ValueError(f"Format file tidak dikenal: {file_type!r}, pilih salah satu dari {WAYPOINT_FILE_TYPES}")
+    if file_type == "csv":
+        return pd.read_csv(source)
+    if file_type == "parquet":
+        return pd.read_parquet(source)
+    return _read_xlsx(source)
+
+
+def validate_waypoints(frame):
+    """
+    Ambil kolom wajib dari frame dan buang baris yang tidak valid: ada nilai kosong, koordinat bukan angka,
+    atau koordinat di luar rentang lintang [-90, 90] / bujur [-180, 180].
+    Kota, Kelurahan dan Nama Toko dijadikan string. ValueError jika ada kolom wajib yang tidak ada.
+    """
+    missing = [column for column in WAYPOINT_COLUMNS if column not in frame.columns]
+    if missing:
+        raise ValueError(f"Kolom wajib tidak ditemukan: {missing}")
+    waypoints = frame[WAYPOINT_COLUMNS].copy()
+    waypoints["Latitude"] = pd.to_numeric(waypoints["Latitude"], errors="coerce")
+    waypoints["Longitude"] = pd.to_numeric(waypoints["Longitude"], errors="coerce")
+    waypoints = waypoints.dropna()
+    valid = waypoints["Latitude"].between(-90, 90) & waypoints["Longitude"].between(-180, 180)
+    waypoints = waypoints[valid]
+    for column in ("Kota", "Kelurahan", "Nama Toko"):
+        waypoints[column] = waypoints[column].astype(str)
     return waypoints
+
+
+def customer_table(frame):
+    """
+    CustomerTable dari baris frame yang lolos validate_waypoints.
+    """
+    waypoints = validate_waypoints(frame)
+    return CustomerTable.from_columns(waypoints["Kota"], waypoints["Kelurahan"], waypoints["Nama Toko"],
+                                      waypoints["Latitude"], waypoints["Longitude"])
+
+
+class WaypointData:
+    """
+    Hasil parsing data lokasi: tabel asli (untuk ditampilkan) dan CustomerTable berisi waypoint yang valid,
+    dengan koordinat sebagai array float64 (N, 2) yang bersebelahan di memori.
+    """
+
+    def __init__(self, frame):
+        self.frame = frame
+        self.table = customer_table(frame)
+
+    def __len__(self):
+        return len(self.table)
+
+    @property
+    def coordinates(self):
+        return self.table.coordinates
+
+    @property
+    def customers(self):
+        # Customer adalah tampilan baris tabel, dibuat saat diminta
+        return list(self.table)
+
+
+def load_waypoints(source, file_type=None):
+    return WaypointData(read_table(source, file_type))
+
+
+def read_waypoints_from_excel(file_path):
+    return load_waypoints(file_path).customers
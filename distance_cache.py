@@ -0,0 +1,170 @@
+# distance_cache.py
+
+import hashlib
+import os
+import tempfile
+
+import numpy as np
+
+from distance_matrix import METRICS, build_distance_matrix
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    "TSP_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "tsp_solver", "distance_matrix")
+)
+DEFAULT_MAX_BYTES = 512 * 1024 ** 2
+
+_POINTS_SUFFIX = ".points.npy"
+_MATRIX_SUFFIX = ".matrix.npy"
+
+
+def _point_keys(points):
+    # Setiap baris (lat, lon) dijadikan satu nilai agar bisa dicari dengan searchsorted
+    points = np.ascontiguousarray(points, dtype=np.float64)
+    return points.view(np.dtype([("lat", "f8"), ("lon", "f8")])).ravel()
+
+
+class DistanceMatrixCache:
+    """
+    Cache matriks jarak di disk, dengan kunci hash koordinat dan metric.
+    Matriks disimpan sebagai file .npy dan dibaca kembali secara memory-mapped (read-only).
+    Ukuran total dibatasi max_bytes dengan kebijakan LRU (berdasarkan mtime file).
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(points, metric):
+        points = np.ascontiguousarray(points, dtype=np.float64)
+        digest = hashlib.sha256(metric.encode())
+        digest.update(np.asarray(points.shape, dtype=np.int64).tobytes())
+        digest.update(points.tobytes())
+        return f"{metric}-{digest.hexdigest()[:32]}"
+
+    def _path(self, key, suffix):
+        return os.path.join(self.cache_dir, key + suffix)
+
+    def _touch(self, key):
+        for suffix in (_MATRIX_SUFFIX, _POINTS_SUFFIX):
+            try:
+                os.utime(self._path(key, suffix))
+            except FileNotFoundError:
+                pass
+
+    def _save(self, path, array):
+        # Tulis ke file sementara lalu rename agar pembaca tidak melihat file setengah jadi
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, array)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def _entries(self, metric=None):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(_MATRIX_SUFFIX):
+                continue
+            key = name[:-len(_MATRIX_SUFFIX)]
+            if metric is not None and not key.startswith(metric + "-"):
+                continue
+            try:
+                stat = os.stat(self._path(key, _MATRIX_SUFFIX))
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, key))
+        return entries
+
+    def get(self, points, metric):
+        """
+        Ambil matriks untuk titik-titik points (urutan sesuai points), atau None.
+        Jika tidak ada entri yang sama persis, cari entri lain yang memuat semua titik
+        lalu potong (slice) matriksnya.
+        """
+        key = self.make_key(points, metric)
+        path = self._path(key, _MATRIX_SUFFIX)
+        if os.path.exists(path):
+            self._touch(key)
+            return np.load(path, mmap_mode="r")
+        return self._get_from_superset(points, metric)
+
+    def _get_from_superset(self, points, metric):
+        query = _point_keys(points)
+        # Entri yang paling baru dipakai dicoba terlebih dahulu
+        for _, key in sorted(self._entries(metric), reverse=True):
+            try:
+                cached_points = np.load(self._path(key, _POINTS_SUFFIX), mmap_mode="r")
+            except FileNotFoundError:
+                continue
+            if len(cached_points) < len(np.unique(query)):
+                continue
+
+            cached = _point_keys(cached_points)
+            order = np.argsort(cached, kind="stable")
+            pos = np.searchsorted(cached[order], query)
+            pos = np.minimum(pos, len(order) - 1)
+            index = order[pos]
+            if not np.array_equal(cached[index], query):
+                continue
+
+            matrix = np.load(self._path(key, _MATRIX_SUFFIX), mmap_mode="r")
+            self._touch(key)
+            subset = np.ascontiguousarray(matrix[np.ix_(index, index)])
+            self.put(points, metric, subset)
+            return subset
+        return None
+
+    def put(self, points, metric, matrix):
+        key = self.make_key(points, metric)
+        self._save(self._path(key, _POINTS_SUFFIX), np.ascontiguousarray(points, dtype=np.float64))
+        self._save(self._path(key, _MATRIX_SUFFIX), np.ascontiguousarray(matrix, dtype=np.float64))
+        self.evict(keep=key)
+
+    def evict(self, keep=None):
+        """
+        Hapus entri yang paling lama tidak dipakai sampai total ukuran <= max_bytes.
+        """
+        entries = []
+        total = 0
+        for mtime, key in self._entries():
+            size = 0
+            for suffix in (_MATRIX_SUFFIX, _POINTS_SUFFIX):
+                try:
+                    size += os.path.getsize(self._path(key, suffix))
+                except FileNotFoundError:
+                    pass
+            entries.append((mtime, key, size))
+            total += size
+
+        for _, key, size in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            for suffix in (_MATRIX_SUFFIX, _POINTS_SUFFIX):
+                try:
+                    os.unlink(self._path(key, suffix))
+                except FileNotFoundError:
+                    pass
+            total -= size
+
+    def get_or_build(self, waypoints, start_point, end_point, metric="vincenty"):
+        """
+        Sama seperti distance_matrix.build_distance_matrix, tetapi memakai cache bila tersedia.
+        """
+        if metric not in METRICS:
+            raise ValueError(f"Metric tidak dikenal: {metric!r}, pilih salah satu dari {METRICS}")
+        points = np.vstack([
+            np.asarray(waypoints, dtype=np.float64).reshape(-1, 2),
+            np.asarray(start_point, dtype=np.float64).reshape(-1, 2),
+            np.asarray(end_point, dtype=np.float64).reshape(-1, 2),
+        ])
+        matrix = self.get(points, metric)
+        if matrix is None:
+            matrix = build_distance_matrix(points[:-2], points[-2], points[-1], metric)
+            self.put(points, metric, matrix)
+        return matrix
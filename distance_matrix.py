@@ -0,0 +1,236 @@
+# distance_matrix.py
+
+import numpy as np
+from geopy.distance import geodesic
+
+# Jari-jari rata-rata bumi (IUGG) dan parameter elipsoid WGS-84 dalam km
+EARTH_RADIUS_KM = 6371.0088
+WGS84_A = 6378.137
+WGS84_F = 1 / 298.257223563
+WGS84_B = WGS84_A * (1 - WGS84_F)
+
+METRICS = ("vincenty", "haversine", "geodesic")
+
+# Batas jumlah pasangan titik per blok agar pemakaian memori tetap terkendali
+_BLOCK_PAIRS = 1_000_000
+
+
+def _as_points(points):
+    return np.asarray(points, dtype=np.float64).reshape(-1, 2)
+
+
+def haversine_matrix(points_a, points_b):
+    """
+    Jarak great-circle (km) antara setiap titik di points_a dan points_b.
+    """
+    a = np.radians(_as_points(points_a))
+    b = np.radians(_as_points(points_b))
+    lat1, lon1 = a[:, 0:1], a[:, 1:2]
+    lat2, lon2 = b[:, 0], b[:, 1]
+
+    h = (np.sin((lat2 - lat1) / 2) ** 2
+         + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(h, 0.0, 1.0)))
+
+
+def _reduced_latitude(points):
+    U = np.arctan((1 - WGS84_F) * np.tan(points[:, 0]))
+    return np.sin(U), np.cos(U)
+
+
+def _vincenty_pairs(sinU1, cosU1, sinU2, cosU2, L, max_iter, tol):
+    f = WGS84_F
+    lam = L.copy()
+    sin_sigma = np.empty_like(L)
+    cos_sigma = np.empty_like(L)
+    sigma = np.empty_like(L)
+    cos2_alpha = np.empty_like(L)
+    cos_2sigma_m = np.empty_like(L)
+    converged = np.zeros(L.shape, dtype=bool)
+
+    # Iterasi hanya pada pasangan yang belum konvergen
+    active = np.arange(len(L))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for _ in range(max_iter):
+            sU1, cU1, sU2, cU2 = sinU1[active], cosU1[active], sinU2[active], cosU2[active]
+            lam_a = lam[active]
+            sin_lam, cos_lam = np.sin(lam_a), np.cos(lam_a)
+            s_sigma = np.hypot(cU2 * sin_lam, cU1 * sU2 - sU1 * cU2 * cos_lam)
+            c_sigma = sU1 * sU2 + cU1 * cU2 * cos_lam
+            sig = np.arctan2(s_sigma, c_sigma)
+            sin_alpha = np.where(s_sigma == 0, 0.0, cU1 * cU2 * sin_lam / s_sigma)
+            c2_alpha = 1 - sin_alpha ** 2
+            # c2_alpha == 0 terjadi pada garis ekuator
+            c_2sigma_m = np.where(c2_alpha == 0, 0.0, c_sigma - 2 * sU1 * sU2 / c2_alpha)
+            C = f / 16 * c2_alpha * (4 + f * (4 - 3 * c2_alpha))
+            lam_new = L[active] + (1 - C) * f * sin_alpha * (
+                sig + C * s_sigma * (c_2sigma_m + C * c_sigma * (-1 + 2 * c_2sigma_m ** 2))
+            )
+
+            lam[active] = lam_new
+            sin_sigma[active] = s_sigma
+            cos_sigma[active] = c_sigma
+            sigma[active] = sig
+            cos2_alpha[active] = c2_alpha
+            cos_2sigma_m[active] = c_2sigma_m
+
+            done = (np.abs(lam_new - lam_a) < tol) | (s_sigma == 0)
+            converged[active[done]] = True
+            active = active[~done]
+            if len(active) == 0:
+                break
+
+        u2 = cos2_alpha * (WGS84_A ** 2 - WGS84_B ** 2) / WGS84_B ** 2
+        A = 1 + u2 / 16384 * (4096 + u2 * (-768 + u2 * (320 - 175 * u2)))
+        B = u2 / 1024 * (256 + u2 * (-128 + u2 * (74 - 47 * u2)))
+        delta_sigma = B * sin_sigma * (
+            cos_2sigma_m + B / 4 * (
+                cos_sigma * (-1 + 2 * cos_2sigma_m ** 2)
+                - B / 6 * cos_2sigma_m * (-3 + 4 * sin_sigma ** 2) * (-3 + 4 * cos_2sigma_m ** 2)
+            )
+        )
+        distance = WGS84_B * A * (sigma - delta_sigma)
+
+    distance[sin_sigma == 0] = 0.0
+    # Titik hampir antipodal tidak konvergen, tandai untuk dihitung ulang secara eksak
+    return distance, converged
+
+
+def vincenty_matrix(points_a, points_b, max_iter=200, tol=1e-12):
+    """
+    Jarak elipsoid WGS-84 (km) dengan rumus invers Vincenty yang divektorisasi.
+    Pasangan yang tidak konvergen (hampir antipodal) dihitung ulang dengan geodesic.
+    """
+    a = np.radians(_as_points(points_a))
+    b = np.radians(_as_points(points_b))
+    ia, ib = np.indices((len(a), len(b))).reshape(2, -1)
+    return _vincenty_indexed(a, b, ia, ib, max_iter, tol).reshape(len(a), len(b))
+
+
+def _vincenty_indexed(a, b, ia, ib, max_iter=200, tol=1e-12):
+    # Hitung jarak untuk pasangan (a[ia[k]], b[ib[k]]) per blok
+    sin_a, cos_a = _reduced_latitude(a)
+    sin_b, cos_b = _reduced_latitude(b)
+    result = np.empty(len(ia))
+    for start in range(0, len(ia), _BLOCK_PAIRS):
+        i = ia[start:start + _BLOCK_PAIRS]
+        j = ib[start:start + _BLOCK_PAIRS]
+        distance, converged = _vincenty_pairs(
+            sin_a[i], cos_a[i], sin_b[j], cos_b[j], b[j, 1] - a[i, 1], max_iter, tol
+        )
+        for k in np.flatnonzero(~converged):
+            distance[k] = geodesic(tuple(np.degrees(a[i[k]])), tuple(np.degrees(b[j[k]]))).kilometers
+        result[start:start + len(i)] = distance
+    return result
+
+
+def geodesic_matrix(points_a, points_b):
+    """
+    Jarak geodesic eksak (Karney, via geopy) untuk setiap pasangan titik.
+    Lambat untuk data besar, dipakai sebagai acuan/fallback.
+    """
+    a = _as_points(points_a)
+    b = _as_points(points_b)
+    result = np.empty((len(a), len(b)))
+    for i in range(len(a)):
+        for j in range(len(b)):
+            result[i, j] = geodesic(tuple(a[i]), tuple(b[j])).kilometers
+    return result
+
+
+_METRIC_FUNCTIONS = {
+    "vincenty": vincenty_matrix,
+    "haversine": haversine_matrix,
+    "geodesic": geodesic_matrix,
+}
+
+
+def pairwise_distances(points, metric="vincenty"):
+    """
+    Matriks jarak simetris (km) antar semua titik.
+    """
+    if metric not in _METRIC_FUNCTIONS:
+        raise ValueError(f"Metric tidak dikenal: {metric!r}, pilih salah satu dari {METRICS}")
+    points = _as_points(points)
+
+    if metric == "geodesic":
+        # Hanya segitiga atas yang dihitung karena jarak bersifat simetris
+        distances = np.zeros((len(points), len(points)))
+        for i in range(len(points)):
+            for j in range(i + 1, len(points)):
+                distances[i, j] = distances[j, i] = geodesic(tuple(points[i]), tuple(points[j])).kilometers
+        return distances
+
+    if metric == "vincenty":
+        # Vincenty cukup dihitung pada segitiga atas lalu dicerminkan
+        rad = np.radians(points)
+        iu, ju = np.triu_indices(len(points), k=1)
+        distances = np.zeros((len(points), len(points)))
+        distances[iu, ju] = _vincenty_indexed(rad, rad, iu, ju)
+        distances[ju, iu] = distances[iu, ju]
+        return distances
+
+    distances = _METRIC_FUNCTIONS[metric](points, points)
+    np.fill_diagonal(distances, 0.0)
+    return distances
+
+
+def build_distance_matrix(waypoints, start_point, end_point, metric="vincenty"):
+    """
+    Bangun matriks jarak (N+2)x(N+2) dalam satu kali proses.
+    Indeks 0..N-1 adalah waypoint, indeks N adalah start_point dan N+1 adalah end_point,
+    sehingga indeks rute tetap sama dengan indeks waypoint.
+    """
+    points = np.vstack([_as_points(waypoints), _as_points(start_point), _as_points(end_point)])
+    return pairwise_distances(points, metric)
+
+
+def num_waypoints(distances):
+    return len(distances) - 2
+
+
+def route_length(distances, route):
+    """
+    Total jarak rute start_point -> route -> end_point berdasarkan matriks jarak.
+    """
+    start, end = len(distances) - 2, len(distances) - 1
+    route = np.asarray(route, dtype=np.intp)
+    if len(route) == 0:
+        return float(distances[start, end])
+    return float(distances[start, route[0]]
+                 + distances[route[:-1], route[1:]].sum()
+                 + distances[route[-1], end])
+
+
+def population_lengths(distances, population):
+    """
+    Total jarak setiap rute dalam populasi (array (P, N)) sekaligus, dengan satu gather ke matriks jarak.
+    """
+    start, end = len(distances) - 2, len(distances) - 1
+    population = np.asarray(population, dtype=np.intp)
+    if population.shape[1] == 0:
+        return np.full(len(population), float(distances[start, end]))
+    return (distances[start, population[:, 0]]
+            + distances[population[:, :-1], population[:, 1:]].sum(axis=1)
+            + distances[population[:, -1], end])
+
+
+def nearest_neighbors(distances, k):
+    """
+    Daftar k waypoint terdekat untuk setiap waypoint, terurut dari yang paling dekat.
+    Hasil berupa array (N, k) yang hanya berisi indeks waypoint (tanpa depot).
+    """
+    n = num_waypoints(distances)
+    k = max(0, min(k, n - 1))
+    if k == 0:
+        return np.empty((n, 0), dtype=np.intp)
+    neighbors = np.empty((n, k), dtype=np.intp)
+    # Diproses per blok baris agar tidak menyalin seluruh matriks sekaligus
+    block = max(1, _BLOCK_PAIRS // max(n, 1))
+    for start in range(0, n, block):
+        rows = np.array(distances[start:min(start + block, n), :n], dtype=np.float64)
+        rows[np.arange(len(rows)), np.arange(start, start + len(rows))] = np.inf
+        nearest = np.argpartition(rows, k - 1, axis=1)[:, :k]
+        order = np.argsort(np.take_along_axis(rows, nearest, axis=1), axis=1, kind="stable")
+        neighbors[start:start + len(rows)] = np.take_along_axis(nearest, order, axis=1)
+    return neighbors
@@ -0,0 +1,337 @@
+# ga_operators.py
+
+import numpy as np
+
+
+# Lebar jendela pencarian waypoint cadangan ERX
+ERX_FALLBACK_WINDOW = 64
+
+
+def _cut_points(rng, batch, n):
+    # Dua titik potong acak per baris, start <= end
+    cuts = np.sort(rng.integers(0, n + 1, size=(batch, 2)), axis=1)
+    return cuts[:, :1], cuts[:, 1:]
+
+
+class CrossoverWorkspace:
+    """
+    Array kerja crossover untuk batch berukuran (B, N): mask, tabel posisi, tabel edge, offset baris
+    dan indeks datar dialokasikan sekali (saat pertama dipakai) lalu dipakai ulang setiap generasi.
+    Operand ufunc disimpan dalam bentuk penuh karena operand yang di-broadcast membuat NumPy
+    mengalokasikan buffer iterasi pada setiap panggilan.
+    """
+
+    def __init__(self, batch, n, dtype=np.intp):
+        self.shape = (batch, n)
+        self.dtype = np.dtype(dtype)
+        self.positions = np.arange(n)
+        self.rows = np.arange(batch)
+        self.window = np.arange(ERX_FALLBACK_WINDOW)
+        self._arrays = {}
+        # offsets[r, :] = r * N, untuk indeks datar (baris r, nilai v) -> r * N + v;
+        # wide_offsets untuk array selebar N + 1 (dengan kolom buangan/penjaga di kolom N)
+        self.offsets = self.row_offsets(n)
+        self.wide_offsets = self.row_offsets(n + 1)
+        self.column_positions = self.full("column_positions", self.positions)
+
+    def array(self, name, dtype=None, shape=None):
+        buffer = self._arrays.get(name)
+        if buffer is None:
+            buffer = np.empty(shape or self.shape, dtype=dtype or self.dtype)
+            self._arrays[name] = buffer
+        return buffer
+
+    def full(self, name, values, dtype=np.intp, shape=None):
+        # Salin values (mis. (B, 1) atau (N,)) ke array kerja penuh; np.copyto tidak memakai buffer
+        buffer = self.array(name, dtype, shape)
+        np.copyto(buffer, values)
+        return buffer
+
+    def row_offsets(self, stride, shape=None):
+        # Array (B, ...) berisi r * stride pada setiap baris r
+        shape = shape or self.shape
+        name = ("row_offsets", stride, shape)
+        if name not in self._arrays:
+            self.full(name, (self.rows * stride).reshape((-1,) + (1,) * (len(shape) - 1)), shape=shape)
+        return self._arrays[name]
+
+    def flat_index(self, values, name):
+        return np.add(values, self.offsets, out=self.array(name, np.intp))
+
+
+def _workspace(parents, workspace):
+    batch, n = parents.shape
+    if workspace is None or workspace.shape != (batch, n):
+        workspace = CrossoverWorkspace(batch, n, parents.dtype)
+    return workspace
+
+
+def _segment_mask(start, end, n, workspace=None):
+    if workspace is None:
+        positions = np.arange(n)
+        return (positions >= start) & (positions < end)
+    positions = workspace.column_positions
+    segment = np.greater_equal(positions, workspace.full("start", start), out=workspace.array("segment", bool))
+    before_end = np.less(positions, workspace.full("end", end), out=workspace.array("before_end", bool))
+    return np.logical_and(segment, before_end, out=segment)
+
+
+def order_crossover(parents_a, parents_b, rng, out=None, workspace=None):
+    """
+    Order crossover (OX) untuk satu batch pasangan induk (array (B, N)).
+    Segmen acak dari parents_a disalin pada posisinya, sisa posisi diisi
+    waypoint yang belum ada dengan urutan seperti di parents_b.
+    workspace (CrossoverWorkspace) menyediakan array kerja agar tidak ada alokasi per panggilan.
+    """
+    batch, n = parents_a.shape
+    if out is None:
+        out = np.empty_like(parents_a)
+    ws = _workspace(parents_a, workspace)
+    start, end = _cut_points(rng, batch, n)
+    segment = _segment_mask(start, end, n, ws)
+
+    # member[r, v] bernilai True jika waypoint v ada di segmen anak r
+    member = ws.array("member", bool)
+    np.put(member, ws.flat_index(parents_a, "flat_a"), segment)
+    taken = np.take(member, ws.flat_index(parents_b, "flat_b"), out=ws.array("taken", bool), mode="clip")
+    keep = np.logical_not(taken, out=ws.array("keep", bool))
+
+    np.copyto(out, parents_a, where=segment)
+    # Waypoint ke-k yang dipertahankan dari parents_b mengisi posisi ke-k di luar segmen:
+    # kolom k jika k < start, selain itu k + (end - start). Nilai yang tidak dipertahankan
+    # ditulis ke kolom buangan N pada buffer (B, N + 1), lalu disalin ke posisi di luar segmen
+    target = ws.array("target", np.intp)
+    np.copyto(target, keep)
+    np.cumsum(target, axis=1, out=target)
+    target -= 1
+    start, end = ws.full("start", start), ws.full("end", end)
+    after_start = np.greater_equal(target, start, out=ws.array("after_start", bool))
+    length = np.subtract(end, start, out=ws.array("segment_length", np.intp))
+    np.add(target, length, out=target, where=after_start)
+    np.copyto(target, n, where=taken)
+    target += ws.wide_offsets
+    scratch = ws.array("scratch", shape=(batch, n + 1))
+    np.put(scratch, target, parents_b)
+    outside = np.logical_not(segment, out=ws.array("outside", bool))
+    np.copyto(out, scratch[:, :n], where=outside)
+    return out
+
+
+def pmx(parents_a, parents_b, rng, out=None, workspace=None):
+    """
+    Partially mapped crossover (PMX) untuk satu batch pasangan induk.
+    Segmen dari parents_a disalin, sisanya dari parents_b dengan konflik
+    diselesaikan mengikuti pemetaan segmen secara iteratif.
+    """
+    batch, n = parents_a.shape
+    if out is None:
+        out = np.empty_like(parents_a)
+    ws = _workspace(parents_a, workspace)
+    start, end = _cut_points(rng, batch, n)
+    segment = _segment_mask(start, end, n, ws)
+    outside = np.logical_not(segment, out=ws.array("outside", bool))
+    # pos_a[r, v] = posisi waypoint v pada parents_a[r]
+    pos_a = ws.array("pos")
+    np.put(pos_a, ws.flat_index(parents_a, "flat_a"), ws.positions)
+
+    np.copyto(out, parents_b)
+    np.copyto(out, parents_a, where=segment)
+
+    # Nilai di luar segmen yang sudah dipakai segmen dipetakan: v -> parents_b[pos_a[v]]
+    index = ws.array("index", np.intp)
+    mapped = ws.array("mapped")
+    conflict = ws.array("conflict", bool)
+    while True:
+        np.take(pos_a, ws.flat_index(out, "flat_out"), out=index, mode="clip")
+        np.add(index, ws.offsets, out=index)
+        np.take(segment, index, out=conflict, mode="clip")
+        np.logical_and(conflict, outside, out=conflict)
+        if not conflict.any():
+            break
+        np.take(parents_b, index, out=mapped, mode="clip")
+        np.copyto(out, mapped, where=conflict)
+    return out
+
+
+def _path_adjacency(population, out=None, fill=-1, workspace=None, slots=(0, 1)):
+    # Tetangga kiri/kanan setiap waypoint pada rute (bukan siklus), fill di ujung rute.
+    # Pada out (B, N, S) tetangga kiri ditulis ke slot slots[0] dan tetangga kanan ke slots[1]
+    batch, n = population.shape
+    if out is None:
+        out = np.empty((batch, n, 2), dtype=population.dtype)
+    if n == 0:
+        return out
+    ws = _workspace(population, workspace)
+    index = ws.array("adjacency_index", np.intp)
+    neighbor = ws.array("adjacency_neighbor")
+    for slot, left in zip(slots, (True, False)):
+        if left:
+            neighbor[:, 1:] = population[:, :-1]
+            neighbor[:, 0] = fill
+        else:
+            neighbor[:, :-1] = population[:, 1:]
+            neighbor[:, -1] = fill
+        # Setiap waypoint muncul sekali per baris, jadi setiap (waypoint, slot) ditulis tepat sekali
+        np.add(population, ws.offsets, out=index)
+        index *= out.shape[2]
+        index += slot
+        np.put(out, index, neighbor)
+    return out
+
+
+def _fallback(ws, fallback_order, visited, pointer, stuck, current):
+    # Untuk baris stuck: waypoint pertama yang belum dikunjungi pada urutan cadangan, dicari per jendela
+    # ERX_FALLBACK_WINDOW posisi mulai dari pointer. Semua baris diproses dengan array kerja penuh,
+    # baris yang tidak sedang dicari hanya dimask
+    batch, n = ws.shape
+    shape = (batch, ERX_FALLBACK_WINDOW)
+    pending = ws.full("pending", stuck, bool, (batch,))
+    window = ws.array("window", np.intp, shape)
+    window_index = ws.array("window_index", np.intp, shape)
+    window_values = ws.array("window_values", np.intp, shape)
+    window_open = ws.array("window_open", bool, shape)
+    found = ws.array("found", bool, (batch,))
+    first = ws.array("first", np.intp, (batch,))
+    index = ws.array("fallback_index", np.intp, (batch,))
+    update = ws.array("update", bool, (batch,))
+    while pending.any():
+        np.copyto(window, pointer[:, None])
+        window += ws.full("window_positions", ws.window, shape=shape)
+        np.minimum(window, n - 1, out=window)
+        np.add(window, ws.row_offsets(n, shape), out=window_index)
+        np.take(fallback_order, window_index, out=window_values, mode="clip")
+        np.add(window_values, ws.row_offsets(n + 1, shape), out=window_index)
+        np.take(visited, window_index, out=window_values, mode="clip")
+        np.equal(window_values, 0, out=window_open)
+        np.any(window_open, axis=1, out=found)
+        np.argmax(window_open, axis=1, out=index)
+        index += ws.row_offsets(ERX_FALLBACK_WINDOW, (batch,))
+        np.take(window, index, out=first, mode="clip")
+        # Jendela yang berisi waypoint terbuka: pointer pindah ke sana; selain itu maju satu jendela
+        np.logical_and(pending, found, out=update)
+        np.copyto(pointer, first, where=update)
+        np.logical_not(found, out=found)
+        np.logical_and(pending, found, out=pending)
+        np.add(pointer, ERX_FALLBACK_WINDOW, out=pointer, where=pending)
+    np.add(pointer, ws.row_offsets(n, (batch,)), out=index)
+    np.take(fallback_order, index, out=index, mode="clip")
+    np.copyto(current, index, where=stuck)
+
+
+def edge_recombination(parents_a, parents_b, rng, out=None, workspace=None):
+    """
+    Edge recombination (ERX) untuk satu batch pasangan induk.
+    Anak dibangun dari edge milik kedua induk: dari waypoint saat ini dipilih
+    tetangga yang belum dikunjungi dengan sisa tetangga paling sedikit,
+    atau waypoint acak yang belum dikunjungi jika tidak ada.
+    Semua anak dalam batch dibangun bersamaan, satu posisi per langkah,
+    dengan indeks datar ke array kerja workspace.
+    """
+    batch, n = parents_a.shape
+    if out is None:
+        out = np.empty_like(parents_a)
+    if n == 0:
+        return out
+    ws = _workspace(parents_a, workspace)
+    # Tabel edge gabungan (B, N, 4); slot kosong berisi N, kolom visited yang selalu sudah dikunjungi
+    edges = ws.array("edges", shape=(batch, n, 4))
+    _path_adjacency(parents_a, edges, n, ws, slots=(0, 1))
+    _path_adjacency(parents_b, edges, n, ws, slots=(2, 3))
+    flat_edges = edges.reshape(batch * n, 4)
+    # visited berupa 0/1 bilangan bulat agar jumlah per kandidat dihitung tanpa konversi dtype
+    visited = ws.array("visited", np.intp, (batch, n + 1))
+    visited.fill(0)
+    visited[:, n] = 1
+    fallback_order = ws.array("fallback")
+    fallback_order[:] = ws.positions
+    rng.permuted(fallback_order, axis=1, out=fallback_order)
+    # Penunjuk ke urutan cadangan; waypoint yang sudah dikunjungi tidak pernah dibuka lagi,
+    # jadi penunjuk hanya maju dan baris urutan cadangan tidak perlu disalin
+    pointer = ws.array("pointer", np.intp, (batch,))
+    pointer.fill(0)
+
+    current = ws.array("current", shape=(batch,))
+    current[:] = parents_a[:, 0]
+    index = ws.array("step_index", np.intp, (batch,))
+    candidates = ws.array("candidates", shape=(batch, 4))
+    candidate_index = ws.array("candidate_index", np.intp, (batch, 4))
+    candidate_visited = ws.array("candidate_visited", np.intp, (batch, 4))
+    second = ws.array("second", shape=(batch, 4, 4))
+    second_visited = ws.array("second_visited", np.intp, (batch, 4, 4))
+    score = ws.array("score", np.intp, (batch, 4))
+    choice = ws.array("choice", np.intp, (batch,))
+    closed = ws.array("closed", np.intp, (batch,))
+    stuck = ws.array("stuck", bool, (batch,))
+    for step in range(n):
+        out[:, step] = current
+        np.add(current, ws.row_offsets(n + 1, (batch,)), out=index)
+        np.put(visited, index, 1)
+        if step == n - 1:
+            break
+        np.add(current, ws.row_offsets(n, (batch,)), out=index)
+        np.take(flat_edges, index, axis=0, out=candidates, mode="clip")
+        np.add(candidates, ws.row_offsets(n + 1, (batch, 4)), out=candidate_index)
+        np.take(visited, candidate_index, out=candidate_visited, mode="clip")
+        # Tetangga setiap kandidat; kandidat N (slot kosong) menunjuk baris yang salah,
+        # tetapi kandidat itu selalu sudah dikunjungi sehingga tidak pernah dipilih
+        np.add(candidates, ws.row_offsets(n, (batch, 4)), out=candidate_index)
+        np.take(flat_edges, candidate_index, axis=0, out=second, mode="clip")
+        np.add(second, ws.row_offsets(n + 1, (batch, 4, 4)), out=second)
+        np.take(visited, second, out=second_visited, mode="clip")
+        # Skor = sisa tetangga yang belum dikunjungi (0..4), + 8 untuk kandidat yang sudah dikunjungi
+        np.sum(second_visited, axis=2, out=score)
+        np.subtract(4, score, out=score)
+        np.multiply(candidate_visited, 8, out=candidate_index)
+        score += candidate_index
+        np.argmin(score, axis=1, out=choice)
+        np.add(choice, ws.row_offsets(4, (batch,)), out=index)
+        np.take(candidates, index, out=current, mode="clip")
+
+        np.min(candidate_visited, axis=1, out=closed)
+        # Baris stuck: semua kandidat sudah dikunjungi
+        np.not_equal(closed, 0, out=stuck)
+        if stuck.any():
+            _fallback(ws, fallback_order, visited, pointer, stuck, current)
+    return out
+
+
+def inversion_mutation(population, rate, rng):
+    """
+    Dengan peluang rate per individu, balik urutan satu segmen acak (in-place).
+    """
+    batch, n = population.shape
+    rows = np.flatnonzero(rng.random(batch) < rate)
+    if len(rows) == 0 or n < 2:
+        return population
+    start, end = _cut_points(rng, len(rows), n)
+    positions = np.arange(n)
+    segment = _segment_mask(start, end, n)
+    index = np.where(segment, start + end - 1 - positions, positions)
+    population[rows] = np.take_along_axis(population[rows], index, axis=1)
+    return population
+
+
+def swap_mutation(population, rate, rng):
+    """
+    Dengan peluang rate per individu, tukar dua posisi acak (in-place).
+    """
+    batch, n = population.shape
+    rows = np.flatnonzero(rng.random(batch) < rate)
+    if len(rows) == 0 or n < 2:
+        return population
+    i = rng.integers(0, n, size=len(rows))
+    j = rng.integers(0, n, size=len(rows))
+    population[rows, i], population[rows, j] = population[rows, j], population[rows, i]
+    return population
+
+
+CROSSOVER_OPERATORS = {
+    "ox": order_crossover,
+    "pmx": pmx,
+    "erx": edge_recombination,
+}
+
+MUTATION_OPERATORS = {
+    "inversion": inversion_mutation,
+    "swap": swap_mutation,
+}
@@ -3,47 +3,65 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import random
-from geopy.distance import geodesic
 from data_utils import read_waypoints_from_excel
+from distance_matrix import num_waypoints, population_lengths
+from local_search import polish_route
+from random_utils import make_rng
+from anytime import SearchMonitor
+from construction import as_routes, seed_population
+from ga_operators import CROSSOVER_OPERATORS, MUTATION_OPERATORS, CrossoverWorkspace
 
 
 
-# Fungsi untuk menghitung jarak antara dua titik
-def distance_between_points(p1, p2):
-    return geodesic(p1, p2).kilometers
-
-# Fungsi untuk menghitung total jarak dalam rute
-def total_distance(route, start_point, end_point):
-    distance = distance_between_points(start_point, route[0])
-    for i in range(len(route) - 1):
-        distance += distance_between_points(route[i], route[i + 1])
-    distance += distance_between_points(route[-1], end_point)
-    return distance
 # Kelas algoritma genetika untuk TSP
 class GA_TSP:
-    def __init__(self, waypoints, start_point, end_point, pop_size, elite_size, mutation_rate, generations):
-        self.waypoints = waypoints
-        self.start_point = start_point
-        self.end_point = end_point
+    def __init__(self, distances, pop_size, elite_size, mutation_rate, generations, local_search=None, seed=None,
+                 crossover="ox", mutation="inversion", time_limit=None, patience=None, target_distance=None,
+                 callback=None, initial_routes=None, neighbors=None):
+        # distances: matriks (N+2)x(N+2) dari distance_matrix.build_distance_matrix
+        self.distances = distances
+        self.num_waypoints = num_waypoints(distances)
         self.pop_size = pop_size
         self.elite_size = elite_size
         self.mutation_rate = mutation_rate
         self.generations = generations
+        # Polishing opsional dari local_search: None, "2opt", "or_opt", "3opt" atau "vnd"
+        self.local_search = local_search
+        # Kandidat tetangga (N, k) untuk local search, misalnya dari spatial_index; None = dari matriks jarak
+        self.neighbors = neighbors
+        self.rng = make_rng(seed)
+        # Operator batch dari ga_operators: crossover "ox", "pmx" atau "erx", mutasi "inversion" atau "swap"
+        if crossover not in CROSSOVER_OPERATORS:
+            raise ValueError(f"Crossover tidak dikenal: {crossover!r}, pilih salah satu dari {sorted(CROSSOVER_OPERATORS)}")
+        if mutation not in MUTATION_OPERATORS:
+            raise ValueError(f"Mutasi tidak dikenal: {mutation!r}, pilih salah satu dari {sorted(MUTATION_OPERATORS)}")
+        self.crossover = CROSSOVER_OPERATORS[crossover]
+        self.mutation = MUTATION_OPERATORS[mutation]
+        # Double buffer populasi, mating pool, buffer induk dan array kerja crossover,
+        # dialokasikan sekali untuk ukuran (pop_size, N) dan dipakai ulang setiap generasi
+        self._buffers = None
+        self._allocate_buffers((pop_size, self.num_waypoints), np.intp)
+        # Berhenti lebih awal (batas waktu, stagnasi, target jarak) dan akses rute terbaik sementara
+        self.monitor = SearchMonitor(time_limit, patience, target_distance, callback)
+        # Rute awal dari construction (array (M, N)) yang menggantikan sebagian populasi awal acak
+        self.initial_routes = None if initial_routes is None else as_routes(initial_routes, self.num_waypoints)
 
     def create_route(self):
-        route = random.sample(range(len(self.waypoints)), len(self.waypoints))
-        return route
+        return self.rng.permutation(self.num_waypoints)
 
     def initial_population(self):
-        return [self.create_route() for _ in range(self.pop_size)]
+        # Populasi berupa array (pop_size, N) berisi indeks waypoint pada matriks jarak
+        population = np.tile(np.arange(self.num_waypoints), (self.pop_size, 1))
+        return seed_population(self.rng.permuted(population, axis=1), self.initial_routes)
 
     def rank_routes(self, population):
-        fitness_results = {}
-        for i, route in enumerate(population):
-            distance = total_distance([self.waypoints[i] for i in route], self.start_point, self.end_point)
-            fitness_results[i] = 1 / distance  # Menggunakan invers jarak sebagai fitness
-        return sorted(fitness_results.items(), key=lambda x: x[1], reverse=True)
+        """
+        Evaluasi seluruh populasi sekaligus terhadap matriks jarak.
+        Mengembalikan (order, fitness): indeks individu terurut dari fitness tertinggi dan array fitness.
+        """
+        fitness = 1 / population_lengths(self.distances, population)  # Menggunakan invers jarak sebagai fitness
+        order = np.argsort(-fitness, kind="stable")
+        return order, fitness
 
     #menggunakan metode roulette selection
     # def selection(self, ranked_routes):
@@ -65,43 +83,35 @@ class GA_TSP:
     
     #menggunakan metode Tournamen selection
     def selection(self, ranked_routes):
+        order, fitness = ranked_routes
         tournament_size = 5
-        selection_results = []
-        for _ in range(self.elite_size):
-            selection_results.append(ranked_routes[_][0])
-        for _ in range(len(ranked_routes) - self.elite_size):
-            tournament = random.sample(ranked_routes, tournament_size)
-            selection_results.append(max(tournament, key=lambda x: x[1])[0])
-        return selection_results
+        elites = order[:self.elite_size]
+        # Semua turnamen diundi sekaligus: satu baris per turnamen
+        tournaments = self.rng.integers(0, len(order), size=(len(order) - self.elite_size, tournament_size))
+        winners = tournaments[np.arange(len(tournaments)), np.argmax(fitness[tournaments], axis=1)]
+        return np.concatenate([elites, winners])
 
 
-    def mating_pool(self, population, selection_results):
-        return [population[i] for i in selection_results]
+    def mating_pool(self, population, selection_results, out=None):
+        return np.take(population, selection_results, axis=0, out=out, mode="clip")
 
     def breed(self, parent1, parent2):
-        gene_a = int(random.random() * len(parent1))
-        gene_b = int(random.random() * len(parent1))
-
-        start_gene = min(gene_a, gene_b)
-        end_gene = max(gene_a, gene_b)
-
-        child_p1 = parent1[start_gene:end_gene]
-        child_p2 = [item for item in parent2 if item not in child_p1]
-
-        child = child_p1 + child_p2
-        return child
+        child = self.crossover(parent1[None, :], parent2[None, :], self.rng)
+        return child[0]
 
-    def breed_population(self, matingpool):
-        children = []
+    def breed_population(self, matingpool, out=None):
+        children = np.empty_like(matingpool) if out is None else out
+        self._allocate_buffers(matingpool.shape, matingpool.dtype)
+        parents_a, parents_b, workspace = self._parents
         length = len(matingpool) - self.elite_size
-        pool = random.sample(matingpool, len(matingpool))
+        order = self.rng.permutation(len(matingpool))
 
-        for i in range(self.elite_size):
-            children.append(matingpool[i])
+        children[:self.elite_size] = matingpool[:self.elite_size]
 
-        for i in range(length):
-            child = self.breed(pool[i], pool[len(matingpool) - i - 1])
-            children.append(child)
+        # Semua pasangan (pool[i], pool[-i-1]) disilangkan dalam satu panggilan batch
+        np.take(matingpool, order[:length], axis=0, out=parents_a, mode="clip")
+        np.take(matingpool, order[::-1][:length], axis=0, out=parents_b, mode="clip")
+        self.crossover(parents_a, parents_b, self.rng, out=children[self.elite_size:], workspace=workspace)
         return children
 
     # def mutate(self, individual):
@@ -112,36 +122,53 @@ class GA_TSP:
     #             individual[swapped], individual[swap_with] = individual[swap_with], individual[swapped]
     #     return individual
     def mutate(self, individual):
-        if random.random() < self.mutation_rate:
-            start, end = sorted(random.sample(range(len(individual)), 2))
-            individual[start:end] = reversed(individual[start:end])
+        self.mutation(individual[None, :], self.mutation_rate, self.rng)
         return individual
 
     def mutate_population(self, population):
-        mutated_pop = [self.mutate(ind) for ind in population]
-        return mutated_pop
-
-    def next_generation(self, current_gen):
-        ranked_routes = self.rank_routes(current_gen)
+        return self.mutation(population, self.mutation_rate, self.rng)
+
+    def _allocate_buffers(self, shape, dtype):
+        # Dialokasikan ulang hanya jika ukuran atau dtype populasi berubah
+        if self._buffers is not None and self._buffers[0].shape == shape and self._buffers[0].dtype == dtype:
+            return
+        self._buffers = [np.empty(shape, dtype), np.empty(shape, dtype)]
+        self._pool = np.empty(shape, dtype)
+        batch = max(shape[0] - self.elite_size, 0)
+        self._parents = (np.empty((batch, shape[1]), dtype), np.empty((batch, shape[1]), dtype),
+                         CrossoverWorkspace(batch, shape[1], dtype))
+
+    def next_generation(self, current_gen, ranked_routes=None):
+        # ranked_routes dari rank_routes(current_gen) dipakai ulang agar populasi hanya dievaluasi sekali
+        if ranked_routes is None:
+            ranked_routes = self.rank_routes(current_gen)
+        self._allocate_buffers(current_gen.shape, current_gen.dtype)
+        # Anak ditulis ke buffer yang tidak sedang dipakai current_gen
+        out = self._buffers[1] if current_gen is self._buffers[0] else self._buffers[0]
         selection_results = self.selection(ranked_routes)
-        matingpool = self.mating_pool(current_gen, selection_results)
-        children = self.breed_population(matingpool)
+        matingpool = self.mating_pool(current_gen, selection_results, out=self._pool)
+        children = self.breed_population(matingpool, out=out)
         next_generation = self.mutate_population(children)
         return next_generation
 
     def optimize(self):
+        monitor = self.monitor
+        monitor.start(self.generations)
         pop = self.initial_population()
-        print("Initial distance: " + str(1 / self.rank_routes(pop)[0][1]))
+        order, fitness = ranked = self.rank_routes(pop)
+        monitor.report(pop[order[0]], 1 / fitness[order[0]])
 
         for i in range(self.generations):
-            pop = self.next_generation(pop)
-            best_distance = 1 / self.rank_routes(pop)[0][1]
-            print(f"Generasi {i+1}/{self.generations}, Jarak Terbaik: {best_distance:.2f} km")
-
-        best_route_index = self.rank_routes(pop)[0][0]
-        best_route = pop[best_route_index]
-        best_distance = 1 / self.rank_routes(pop)[0][1]
-        
-        return best_route, best_distance
+            pop = self.next_generation(pop, ranked)
+            order, fitness = ranked = self.rank_routes(pop)
+            best_distance = 1 / fitness[order[0]]
+            if monitor.step(pop[order[0]], best_distance):
+                break
+
+        best_route, best_distance = monitor.best()
+        if self.local_search:
+            best_route, best_distance = polish_route(best_route, self.distances, self.local_search, self.neighbors)
+
+        return monitor.finish(best_route, best_distance)
 
   
@@ -0,0 +1,141 @@
+# island_ga.py
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from anytime import SearchMonitor
+from construction import as_routes
+from distance_matrix import num_waypoints, population_lengths
+from genetic import GA_TSP
+from local_search import polish_route
+from random_utils import spawn_rngs
+from shared_array import attach_shared_array, create_shared_array
+
+MIGRATION_TOPOLOGIES = ("ring", "random")
+
+# Matriks jarak di proses worker, di-attach sekali lewat initializer
+_worker_shm = None
+_worker_distances = None
+
+
+def _attach_distances(spec):
+    global _worker_shm, _worker_distances
+    _worker_shm, _worker_distances = attach_shared_array(spec)
+
+
+def _evolve_island(population, rng, ga_params, generations):
+    # Jalankan beberapa generasi GA pada satu pulau, lalu kembalikan populasi dan rng terbaru
+    ga = GA_TSP(_worker_distances, **ga_params)
+    ga.rng = rng
+    ranked = ga.rank_routes(population)
+    for _ in range(generations):
+        population = ga.next_generation(population, ranked)
+        ranked = ga.rank_routes(population)
+    order, fitness = ranked
+    return population.copy(), ga.rng, int(order[0]), float(1 / fitness[order[0]])
+
+
+class IslandGA:
+    """
+    GA model pulau: num_islands sub-populasi GA_TSP berevolusi paralel di ProcessPoolExecutor.
+    Setiap migration_interval generasi, migration_size individu terbaik tiap pulau
+    menggantikan individu terburuk pulau tujuan (topologi "ring" atau "random").
+    Matriks jarak dibagikan ke worker lewat shared memory, bukan di-pickle.
+    pop_size, elite_size, mutation_rate dan generations berlaku per pulau.
+    Kriteria berhenti lebih awal (time_limit, patience dalam generasi, target_distance) diperiksa per epoch migrasi.
+    """
+
+    def __init__(self, distances, pop_size, elite_size, mutation_rate, generations, local_search=None, seed=None,
+                 crossover="ox", mutation="inversion", num_islands=None, migration_interval=10,
+                 migration_size=None, topology="ring", max_workers=None, time_limit=None, patience=None,
+                 target_distance=None, callback=None, initial_routes=None, neighbors=None):
+        if topology not in MIGRATION_TOPOLOGIES:
+            raise ValueError(f"Topologi tidak dikenal: {topology!r}, pilih salah satu dari {MIGRATION_TOPOLOGIES}")
+        self.distances = distances
+        self.generations = generations
+        self.local_search = local_search
+        # Kandidat tetangga (N, k) untuk local search, misalnya dari spatial_index; None = dari matriks jarak
+        self.neighbors = neighbors
+        self.num_islands = num_islands or min(4, os.cpu_count() or 1)
+        self.migration_interval = max(1, migration_interval)
+        self.migration_size = elite_size if migration_size is None else migration_size
+        self.migration_size = min(self.migration_size, pop_size - 1)
+        self.topology = topology
+        self.max_workers = max_workers or min(self.num_islands, os.cpu_count() or 1)
+        self.ga_params = dict(pop_size=pop_size, elite_size=elite_size, mutation_rate=mutation_rate,
+                              generations=generations, crossover=crossover, mutation=mutation)
+        self.monitor = SearchMonitor(time_limit, patience, target_distance, callback)
+        # Rute awal dari construction dibagi bergiliran ke pulau-pulau
+        self.initial_routes = None if initial_routes is None else as_routes(initial_routes, num_waypoints(distances))
+
+        # Seed per pulau diturunkan dari satu SeedSequence agar hasil deterministik
+        rngs = spawn_rngs(seed, self.num_islands + 1)
+        self.rng = rngs[0]
+        self.island_rngs = rngs[1:]
+
+    def migrate(self, populations):
+        """
+        Salin individu terbaik setiap pulau ke pulau tujuan, menggantikan individu terburuknya.
+        """
+        if self.migration_size <= 0 or len(populations) < 2:
+            return populations
+        k = len(populations)
+        if self.topology == "ring":
+            targets = [(i + 1) % k for i in range(k)]
+        else:
+            targets = [(i + self.rng.integers(1, k)) % k for i in range(k)]
+
+        lengths = [population_lengths(self.distances, pop) for pop in populations]
+        emigrants = [pop[np.argsort(length, kind="stable")[:self.migration_size]].copy()
+                     for pop, length in zip(populations, lengths)]
+        for source, target in enumerate(targets):
+            worst = np.argsort(lengths[target], kind="stable")[::-1][:self.migration_size]
+            populations[target][worst] = emigrants[source]
+            lengths[target][worst] = population_lengths(self.distances, emigrants[source])
+        return populations
+
+    def optimize(self):
+        monitor = self.monitor
+        monitor.start(self.generations)
+        seeding_ga = GA_TSP(self.distances, **self.ga_params)
+        populations = []
+        for island, rng in enumerate(self.island_rngs):
+            seeding_ga.rng = rng
+            if self.initial_routes is not None:
+                seeding_ga.initial_routes = self.initial_routes[island::self.num_islands]
+            populations.append(seeding_ga.initial_population())
+
+        shm, spec = create_shared_array(np.ascontiguousarray(self.distances, dtype=np.float64))
+        try:
+            with ProcessPoolExecutor(max_workers=self.max_workers, initializer=_attach_distances,
+                                     initargs=(spec,)) as executor:
+                done = 0
+                while done < self.generations:
+                    epoch = min(self.migration_interval, self.generations - done)
+                    futures = [executor.submit(_evolve_island, pop, rng, self.ga_params, epoch)
+                               for pop, rng in zip(populations, self.island_rngs)]
+                    results = [future.result() for future in futures]
+                    populations = [pop for pop, _, _, _ in results]
+                    self.island_rngs = [rng for _, rng, _, _ in results]
+                    done += epoch
+                    best_pop, _, best_index, best_distance = min(results, key=lambda result: result[3])
+                    if monitor.step(best_pop[best_index], best_distance, iterations=epoch):
+                        break
+                    if done < self.generations:
+                        populations = self.migrate(populations)
+        finally:
+            shm.close()
+            shm.unlink()
+
+        population = np.concatenate(populations)
+        lengths = population_lengths(self.distances, population)
+        best = int(np.argmin(lengths))
+        best_route = population[best].tolist()
+        best_distance = float(lengths[best])
+
+        if self.local_search:
+            best_route, best_distance = polish_route(best_route, self.distances, self.local_search, self.neighbors)
+
+        return monitor.finish(best_route, best_distance)
@@ -0,0 +1,181 @@
+# lin_kernighan.py
+
+import numpy as np
+
+from anytime import SearchMonitor
+from construction import as_routes, nearest_neighbor_route
+from distance_matrix import nearest_neighbors, num_waypoints, population_lengths, route_length
+from local_search import EPSILON, Tour, candidate_lists, improve_tour, or_opt_move, variable_neighborhood_descent
+from random_utils import make_rng
+
+# Kick hanya diterima jika memperbaiki rute lebih dari nilai ini (km)
+IMPROVEMENT_TOLERANCE = 1e-7
+
+
+def lk_move(t1, tour, dist, candidates, max_depth=6):
+    """
+    Satu langkah Lin-Kernighan dari t1 sebagai rangkaian 2-opt berurutan:
+    hapus (t1, t2), tambah (t2, t3), hapus (t4, t3), tutup dengan (t4, t1), lalu lanjutkan
+    dengan (t1, t4) sebagai edge berikutnya yang dihapus selama gain kumulatif positif.
+    Kedua arah (t2 = succ/pred t1) dicoba. Prefiks rangkaian dengan gain terbaik
+    dipertahankan, sisanya dibatalkan.
+    """
+    path, pos = tour.path, tour.pos
+    last = len(path) - 1
+
+    for forward in (True, False):
+        p = pos[t1]
+        if (forward and p == last) or (not forward and p == 0):
+            continue
+        t2 = path[p + 1] if forward else path[p - 1]
+        gain = dist(t1, t2)
+        best_gain = EPSILON
+        best_step = 0
+        reversals = []
+        changed = [t1, t2]
+
+        for _ in range(max_depth):
+            # Pilih t3 dengan gain + d(t4, t3) terbesar (look-ahead LK),
+            # t4 adalah tetangga t3 di sisi yang membuat penutupan (t4, t1) valid
+            best = None
+            for t3 in candidates[t2]:
+                g = gain - dist(t2, t3)
+                # Aturan henti LK: lanjut hanya jika gain parsial melebihi gain terbaik yang sudah ditutup
+                if g <= best_gain:
+                    break
+                q = pos[t3]
+                if t3 == t1 or (forward and q == 0) or (not forward and q == last):
+                    continue
+                t4 = path[q - 1] if forward else path[q + 1]
+                if t4 == t2:
+                    continue
+                value = g + dist(t4, t3)
+                if best is None or value > best[0]:
+                    best = (value, t3, t4)
+            if best is None:
+                break
+
+            gain, t3, t4 = best
+            # Ganti edge (t1, t2) dan (t4, t3) dengan (t1, t4) dan (t2, t3)
+            e1 = min(pos[t1], pos[t2])
+            e2 = min(pos[t3], pos[t4])
+            i, j = (e1 + 1, e2) if e1 < e2 else (e2 + 1, e1)
+            tour.reverse(i, j)
+            reversals.append((i, j))
+            changed += [t3, t4]
+
+            tour_gain = gain - dist(t1, t4)
+            if tour_gain > best_gain:
+                best_gain = tour_gain
+                best_step = len(reversals)
+            # Edge (t1, t4) menjadi edge berikutnya yang dihapus; arah bisa berbalik
+            forward = pos[t4] > pos[t1]
+            t2 = t4
+
+        for i, j in reversed(reversals[best_step:]):
+            tour.undo_reverse(i, j)
+        if best_step:
+            return changed
+    return None
+
+
+class LK_TSP:
+    """
+    Solver Lin-Kernighan (iterated/chained LK) untuk rute terbuka start_point -> end_point.
+    Memakai daftar kandidat tetangga terdekat, don't-look bits, dan kick double-bridge
+    sampai batas waktu atau jumlah iterasi tercapai. Satu kick dihitung sebagai satu iterasi
+    untuk patience dan callback.
+    """
+
+    def __init__(self, distances, time_limit=10.0, max_iterations=None, num_candidates=8, max_depth=6,
+                 seed=None, patience=None, target_distance=None, callback=None, neighbors=None,
+                 initial_routes=None):
+        # Tanpa salah satu batas ini loop kick tidak pernah berhenti (target_distance belum tentu tercapai)
+        if time_limit is None and max_iterations is None and patience is None:
+            raise ValueError("LK_TSP membutuhkan time_limit, max_iterations atau patience")
+        # distances: matriks (N+2)x(N+2) dari distance_matrix.build_distance_matrix
+        self.distances = distances
+        self.num_waypoints = num_waypoints(distances)
+        self.time_limit = time_limit
+        self.max_iterations = max_iterations
+        self.num_candidates = num_candidates
+        self.max_depth = max_depth
+        self.rng = make_rng(seed)
+        self.monitor = SearchMonitor(time_limit, patience, target_distance, callback)
+        # Daftar tetangga (N, k) yang sudah dihitung (mis. dari spatial_index); None = dari matriks jarak
+        self.neighbors = neighbors
+        # Rute awal dari construction (array (M, N)); yang terpendek menggantikan nearest neighbor
+        self.initial_routes = None if initial_routes is None else as_routes(initial_routes, self.num_waypoints)
+
+    def initial_route(self):
+        # Rute awal terpendek dari initial_routes, atau nearest neighbor dari start_point
+        if self.initial_routes is not None and len(self.initial_routes):
+            lengths = population_lengths(self.distances, self.initial_routes)
+            return self.initial_routes[int(np.argmin(lengths))].tolist()
+        return nearest_neighbor_route(self.distances).tolist()
+
+    def move(self, t1, tour, dist, candidates):
+        changed = lk_move(t1, tour, dist, candidates, self.max_depth)
+        if changed is None:
+            changed = or_opt_move(t1, tour, dist, candidates)
+        return changed
+
+    def kick(self, tour):
+        """
+        Double-bridge untuk rute terbuka: A B C D E -> A D C B E, dengan segmen pendek
+        yang berdekatan agar local search sesudahnya tetap murah. Mengembalikan titik yang edge-nya berubah.
+        """
+        path = tour.path
+        n = self.num_waypoints
+        max_len = max(1, min(50, n // 3))
+        len_b, len_c, len_d = (int(x) for x in self.rng.integers(1, max_len + 1, size=3))
+        a = int(self.rng.integers(0, n - len_b - len_c - len_d + 1))
+        b, c, d = a + len_b, a + len_b + len_c, a + len_b + len_c + len_d
+        changed = [path[m] for m in (a, a + 1, b, b + 1, c, c + 1, d, d + 1)]
+        # A B (C D) E -> A (C D) B E -> A D C B E
+        tour.swap_adjacent(a, b, d)
+        tour.swap_adjacent(a, a + len_c, a + len_c + len_d)
+        return changed
+
+    def optimize(self):
+        n = self.num_waypoints
+        monitor = self.monitor
+        monitor.start(self.max_iterations)
+        if self.neighbors is not None:
+            neighbors = np.asarray(self.neighbors, dtype=np.intp)
+        else:
+            neighbors = nearest_neighbors(self.distances, self.num_candidates)
+        candidates = candidate_lists(self.distances, neighbors)
+
+        # LK dimulai dari rute yang sudah dipoles 2-opt/Or-opt/3-opt agar pembalikan
+        # segmen panjang yang akhirnya dibatalkan tidak menghabiskan waktu
+        route = variable_neighborhood_descent(self.initial_route(), self.distances, neighbors)
+        tour = Tour(route, self.distances)
+        improve_tour(tour, self.distances, candidates, self.move)
+        tour.length = best_distance = route_length(self.distances, tour.route())
+        monitor.report(tour.route(), best_distance)
+
+        iteration = 0
+        while n >= 3 and not monitor.should_stop():
+            if self.max_iterations is not None and iteration >= self.max_iterations:
+                break
+            iteration += 1
+
+            tour.begin()
+            changed = self.kick(tour)
+            improve_tour(tour, self.distances, candidates, self.move, queue=changed, verify=False)
+            if tour.length < best_distance - IMPROVEMENT_TOLERANCE:
+                tour.commit()
+                # Sinkronkan ulang agar galat pembaruan inkremental tidak menumpuk
+                tour.length = best_distance = route_length(self.distances, tour.route())
+                stop = monitor.step(tour.route(), best_distance)
+            else:
+                # Kembali ke rute terbaik
+                tour.rollback()
+                tour.length = best_distance
+                stop = monitor.step(None, best_distance)
+            if stop:
+                break
+
+        monitor.finish()
+        return tour.route(), best_distance
@@ -0,0 +1,408 @@
+# local_search.py
+
+from collections import deque
+from functools import partial
+
+import numpy as np
+
+from distance_matrix import nearest_neighbors, num_waypoints, route_length
+
+# Jumlah tetangga terdekat yang diperiksa untuk setiap waypoint
+DEFAULT_NEIGHBORS = 16
+
+# Perbaikan lebih kecil dari ini dianggap noise floating point
+EPSILON = 1e-10
+
+
+class Tour:
+    """
+    Rute terbuka start_point -> waypoint -> end_point beserta posisi setiap titik.
+    path[0] adalah depot awal (indeks N) dan path[-1] depot akhir (indeks N+1); keduanya tidak pernah dipindah.
+    Panjang rute (length) diperbarui secara inkremental pada setiap operasi. Setelah begin(),
+    semua operasi dicatat sehingga bisa dibatalkan dengan rollback().
+    """
+
+    def __init__(self, route, distances):
+        n = num_waypoints(distances)
+        self.path = [n] + [int(c) for c in route] + [n + 1]
+        self.pos = [0] * (n + 2)
+        for i, city in enumerate(self.path):
+            self.pos[city] = i
+        self.dist = distances.item
+        self.length = route_length(distances, self.path[1:-1])
+        self.journal = None
+
+    def begin(self):
+        self.journal = []
+
+    def commit(self):
+        self.journal = None
+
+    def rollback(self):
+        journal, self.journal = self.journal, None
+        for op, *args in reversed(journal):
+            if op == "reverse":
+                self.reverse(*args)
+            elif op == "move":
+                i, j, k, reverse = args
+                size = j - i + 1
+                if k < i:
+                    self.move_segment(k + 1, k + size, j, reverse)
+                else:
+                    self.move_segment(k - size + 1, k, i - 1, reverse)
+            else:
+                a, b, c = args
+                self.swap_adjacent(a, a + c - b, c)
+
+    def undo_reverse(self, i, j):
+        # Batalkan reverse(i, j) terakhir tanpa menambah catatan di journal
+        journal, self.journal = self.journal, None
+        self.reverse(i, j)
+        self.journal = journal
+        if journal:
+            journal.pop()
+
+    def reverse(self, i, j):
+        # Balik segmen path[i..j] di tempat dan perbarui posisinya
+        path, pos, dist = self.path, self.pos, self.dist
+        self.length += (dist(path[i - 1], path[j]) + dist(path[i], path[j + 1])
+                        - dist(path[i - 1], path[i]) - dist(path[j], path[j + 1]))
+        path[i:j + 1] = path[i:j + 1][::-1]
+        for k in range(i, j + 1):
+            pos[path[k]] = k
+        if self.journal is not None:
+            self.journal.append(("reverse", i, j))
+
+    def move_segment(self, i, j, k, reverse=False):
+        # Pindahkan segmen path[i..j] ke antara path[k] dan path[k+1] (k di luar segmen)
+        path, pos, dist = self.path, self.pos, self.dist
+        s, e, u, v = path[i], path[j], path[k], path[k + 1]
+        x, y = (e, s) if reverse else (s, e)
+        self.length += (dist(path[i - 1], path[j + 1]) - dist(path[i - 1], s) - dist(e, path[j + 1])
+                        + dist(u, x) + dist(y, v) - dist(u, v))
+        segment = path[i:j + 1]
+        if reverse:
+            segment.reverse()
+        if k < i:
+            lo, hi = k + 1, j
+            path[lo:hi + 1] = segment + path[k + 1:i]
+        else:
+            lo, hi = i, k
+            path[lo:hi + 1] = path[j + 1:k + 1] + segment
+        for m in range(lo, hi + 1):
+            pos[path[m]] = m
+        if self.journal is not None:
+            self.journal.append(("move", i, j, k, reverse))
+
+    def swap_adjacent(self, a, b, c):
+        # Tukar segmen path[a+1..b] dan path[b+1..c]
+        path, pos, dist = self.path, self.pos, self.dist
+        xa, xa1, xb, xb1, xc, xc1 = path[a], path[a + 1], path[b], path[b + 1], path[c], path[c + 1]
+        self.length += (dist(xa, xb1) + dist(xc, xa1) + dist(xb, xc1)
+                        - dist(xa, xa1) - dist(xb, xb1) - dist(xc, xc1))
+        path[a + 1:c + 1] = path[b + 1:c + 1] + path[a + 1:b + 1]
+        for m in range(a + 1, c + 1):
+            pos[path[m]] = m
+        if self.journal is not None:
+            self.journal.append(("swap", a, b, c))
+
+    def route(self):
+        return self.path[1:-1]
+
+
+def two_opt_move(t1, tour, dist, neighbors):
+    """
+    Cari langkah 2-opt pertama yang memperbaiki rute dengan edge di sekitar t1.
+    Mengembalikan titik-titik yang edge-nya berubah, atau None.
+    """
+    path, pos = tour.path, tour.pos
+    p = pos[t1]
+
+    # Arah maju: hapus (t1, t2=succ t1) dan (t3, t4=succ t3), tambah (t1, t3) dan (t2, t4)
+    t2 = path[p + 1] if p < len(path) - 1 else t1
+    d12 = dist(t1, t2)
+    for t3 in neighbors[t1]:
+        d13 = dist(t1, t3)
+        if d13 >= d12:
+            break
+        q = pos[t3]
+        if q == len(path) - 1:
+            continue
+        t4 = path[q + 1]
+        if t3 == t2 or t4 == t1:
+            continue
+        delta = d13 + dist(t2, t4) - d12 - dist(t3, t4)
+        if delta < -EPSILON:
+            if q > p:
+                tour.reverse(p + 1, q)
+            else:
+                tour.reverse(q + 1, p)
+            return t1, t2, t3, t4
+
+    # Arah mundur: hapus (t2=pred t1, t1) dan (t4=pred t3, t3), tambah (t1, t3) dan (t2, t4)
+    t2 = path[p - 1] if p > 0 else t1
+    d12 = dist(t2, t1)
+    for t3 in neighbors[t1]:
+        d13 = dist(t1, t3)
+        if d13 >= d12:
+            break
+        q = pos[t3]
+        if q == 0:
+            continue
+        t4 = path[q - 1]
+        if t3 == t2 or t4 == t1:
+            continue
+        delta = d13 + dist(t2, t4) - d12 - dist(t4, t3)
+        if delta < -EPSILON:
+            if q > p:
+                tour.reverse(p, q - 1)
+            else:
+                tour.reverse(q, p - 1)
+            return t1, t2, t3, t4
+
+    return None
+
+
+def or_opt_move(t1, tour, dist, neighbors, max_segment=3):
+    """
+    Or-opt: pindahkan segmen 1..max_segment titik yang diawali t1 ke posisi lain,
+    dengan orientasi asli maupun terbalik.
+    """
+    path, pos = tour.path, tour.pos
+    last = len(path) - 1
+    i = pos[t1]
+    if i == 0 or i == last:
+        return None
+
+    for j in range(i, min(i + max_segment, last)):
+        s, e = path[i], path[j]
+        p, nx = path[i - 1], path[j + 1]
+        removal_gain = dist(p, s) + dist(e, nx) - dist(p, nx)
+        if removal_gain <= EPSILON:
+            continue
+        for end in (s, e):
+            for c in neighbors[end]:
+                if dist(end, c) >= removal_gain:
+                    break
+                k = pos[c]
+                # Sisipkan di edge (path[m], path[m+1]) dengan c sebagai salah satu ujungnya
+                for m in (k, k - 1):
+                    if m < 0 or m >= last or i - 1 <= m <= j:
+                        continue
+                    u, v = path[m], path[m + 1]
+                    d_uv = dist(u, v)
+                    for reverse in (False, True):
+                        x, y = (e, s) if reverse else (s, e)
+                        delta = dist(u, x) + dist(y, v) - d_uv - removal_gain
+                        if delta < -EPSILON:
+                            tour.move_segment(i, j, m, reverse)
+                            return p, nx, s, e, u, v
+    return None
+
+
+def three_opt_move(t1, tour, dist, neighbors):
+    """
+    3-opt segment insertion (tanpa pembalikan): tukar dua segmen bersebelahan B dan C
+    pada A B C D menjadi A C B D. Panjang segmen bebas; kandidat dicari dari daftar tetangga
+    dengan kriteria gain positif, ke arah maju (t1 = ujung A) dan mundur (t1 = awal D).
+    """
+    path, pos = tour.path, tour.pos
+    last = len(path) - 1
+    r = pos[t1]
+
+    # Maju: t1 = x_a, edge baru (x_a, x_b+1), (x_c, x_a+1), (x_b, x_c+1)
+    a = r
+    if a <= last - 3:
+        xa, xa1 = path[a], path[a + 1]
+        d_a = dist(xa, xa1)
+        for xb1 in neighbors[xa]:
+            g1 = d_a - dist(xa, xb1)
+            if g1 <= EPSILON:
+                break
+            b = pos[xb1] - 1
+            if b <= a or b + 1 >= last:
+                continue
+            xb = path[b]
+            g1 += dist(xb, xb1)
+            for xc in neighbors[xa1]:
+                g2 = g1 - dist(xc, xa1)
+                if g2 <= EPSILON:
+                    break
+                c = pos[xc]
+                if c <= b or c >= last:
+                    continue
+                xc1 = path[c + 1]
+                if g2 + dist(xc, xc1) - dist(xb, xc1) > EPSILON:
+                    tour.swap_adjacent(a, b, c)
+                    return xa, xa1, xb, xb1, xc, xc1
+
+    # Mundur: t1 = x_c+1, edge baru (x_c+1, x_b), (x_a+1, x_c), (x_a, x_b+1)
+    c = r - 1
+    if c >= 2:
+        xc, xc1 = path[c], path[c + 1]
+        d_c = dist(xc, xc1)
+        for xb in neighbors[xc1]:
+            g1 = d_c - dist(xc1, xb)
+            if g1 <= EPSILON:
+                break
+            b = pos[xb]
+            if b < 1 or b >= c:
+                continue
+            xb1 = path[b + 1]
+            g1 += dist(xb, xb1)
+            for xa1 in neighbors[xc]:
+                g2 = g1 - dist(xc, xa1)
+                if g2 <= EPSILON:
+                    break
+                a = pos[xa1] - 1
+                if a < 0 or a >= b:
+                    continue
+                xa = path[a]
+                if g2 + dist(xa, xa1) - dist(xa, xb1) > EPSILON:
+                    tour.swap_adjacent(a, b, c)
+                    return xa, xa1, xb, xb1, xc, xc1
+    return None
+
+
+def candidate_lists(distances, neighbors=None):
+    """
+    Daftar kandidat untuk setiap titik (N waypoint + 2 depot), terurut dari yang terdekat.
+    Depot ikut menjadi kandidat (dan punya daftar kandidat sendiri)
+    agar edge ke start_point/end_point juga bisa diganti.
+    """
+    n = num_waypoints(distances)
+    if neighbors is None:
+        neighbors = nearest_neighbors(distances, DEFAULT_NEIGHBORS)
+    k = len(neighbors[0]) if n else 0
+
+    candidates = []
+    for city, row in enumerate(neighbors):
+        row = [int(c) for c in row]
+        for depot in (n, n + 1):
+            d = distances[city, depot]
+            i = 0
+            while i < len(row) and distances[city, row[i]] <= d:
+                i += 1
+            row.insert(i, depot)
+        candidates.append(row)
+    for depot in (n, n + 1):
+        row = np.asarray(distances[depot, :n])
+        nearest = np.argpartition(row, k - 1)[:k] if 0 < k < n else np.arange(n)
+        candidates.append([int(c) for c in nearest[np.argsort(row[nearest], kind="stable")]])
+    return candidates
+
+
+def improve_tour(tour, distances, candidates, move, queue=None, verify=True):
+    """
+    Terapkan move (mis. two_opt_move) sampai tidak ada perbaikan, dengan don't-look bits:
+    hanya titik yang edge-nya berubah yang diperiksa ulang. queue berisi titik awal yang
+    diperiksa (default semua titik). Jika verify, satu putaran penuh diulang setelah ada
+    perbaikan karena pembalikan segmen bisa membuka langkah baru di titik yang bit-nya sudah mati.
+    Mengembalikan True jika rute berubah.
+    """
+    dist = distances.item
+    size = len(tour.path)
+    queue = deque(tour.path if queue is None else queue)
+    queued = [False] * size
+    for city in queue:
+        queued[city] = True
+
+    improved = False
+    while queue:
+        improved_in_pass = False
+        while queue:
+            t1 = queue.popleft()
+            queued[t1] = False
+            changed = move(t1, tour, dist, candidates)
+            if changed is None:
+                continue
+            improved = improved_in_pass = True
+            for city in changed:
+                if not queued[city]:
+                    queued[city] = True
+                    queue.append(city)
+        if verify and improved_in_pass:
+            queue.extend(tour.path)
+            queued = [True] * size
+    return improved
+
+
+def _local_search(route, distances, candidates, move):
+    if num_waypoints(distances) < 2:
+        return list(route), False
+    tour = Tour(route, distances)
+    improved = improve_tour(tour, distances, candidates, move)
+    return tour.route(), improved
+
+
+def two_opt(route, distances, neighbors=None):
+    """
+    2-opt dengan evaluasi delta O(1) dari matriks jarak (distance_matrix.build_distance_matrix).
+    Edge ke start_point/end_point ikut dioptimalkan, tetapi kedua depot tetap di ujung rute.
+    Kandidat dibatasi pada neighbors (array (N, k), default DEFAULT_NEIGHBORS tetangga terdekat)
+    dan memakai don't-look bits. Matriks jarak diasumsikan simetris.
+    """
+    candidates = candidate_lists(distances, neighbors)
+    return _local_search(route, distances, candidates, two_opt_move)[0]
+
+
+def or_opt(route, distances, neighbors=None, max_segment=3):
+    """
+    Or-opt dengan evaluasi delta: pindahkan segmen 1..max_segment waypoint (boleh dibalik).
+    """
+    candidates = candidate_lists(distances, neighbors)
+    improve = partial(or_opt_move, max_segment=max_segment)
+    return _local_search(route, distances, candidates, improve)[0]
+
+
+def three_opt(route, distances, neighbors=None):
+    """
+    3-opt segment insertion dengan evaluasi delta: tukar dua segmen bersebelahan tanpa pembalikan.
+    """
+    candidates = candidate_lists(distances, neighbors)
+    return _local_search(route, distances, candidates, three_opt_move)[0]
+
+
+def variable_neighborhood_descent(route, distances, neighbors=None):
+    """
+    VND: 2-opt -> Or-opt -> 3-opt. Setiap kali operator berikutnya menemukan perbaikan,
+    pencarian kembali ke 2-opt. Berhenti saat rute optimal lokal untuk ketiganya.
+    """
+    candidates = candidate_lists(distances, neighbors)
+    operators = [two_opt_move, or_opt_move, three_opt_move]
+    route = list(route)
+    k = 0
+    while k < len(operators):
+        route, improved = _local_search(route, distances, candidates, operators[k])
+        k = 0 if improved and k > 0 else k + 1
+    return route
+
+
+LOCAL_SEARCH_METHODS = {
+    "2opt": two_opt,
+    "or_opt": or_opt,
+    "3opt": three_opt,
+    "vnd": variable_neighborhood_descent,
+}
+
+
+def polish_route(route, distances, method="vnd", neighbors=None):
+    """
+    Tahap polishing opsional untuk hasil solver. Mengembalikan (route, jarak).
+    Rute yang hanya memuat sebagian waypoint (mis. hasil BPSO_TSP) dioptimalkan
+    pada sub-matriks waypoint tersebut.
+    """
+    if method not in LOCAL_SEARCH_METHODS:
+        raise ValueError(f"Local search tidak dikenal: {method!r}, pilih salah satu dari {tuple(LOCAL_SEARCH_METHODS)}")
+    route = [int(c) for c in route]
+    n = num_waypoints(distances)
+
+    if len(route) == n:
+        polished = LOCAL_SEARCH_METHODS[method](route, distances, neighbors)
+        return polished, route_length(distances, polished)
+
+    index = np.asarray(route + [n, n + 1], dtype=np.intp)
+    sub_distances = np.asarray(distances)[np.ix_(index, index)]
+    polished = LOCAL_SEARCH_METHODS[method](list(range(len(route))), sub_distances)
+    polished = [route[i] for i in polished]
+    return polished, route_length(distances, polished)
@@ -4,96 +4,178 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import random
-from geopy.distance import geodesic
 from data_utils import read_waypoints_from_excel
+from distance_matrix import num_waypoints, population_lengths, route_length
+from local_search import polish_route
+from random_utils import make_rng
+from anytime import SearchMonitor
+from construction import as_routes, seed_population
 
-# Fungsi untuk menghitung jarak antara dua titik menggunakan geodesic (lat, lon)
-def distance_between_points(p1, p2):
-    return geodesic(p1, p2).kilometers
+# Iterasi tanpa perbaikan p_best sebelum partikel didiversifikasi dengan inversi segmen acak
+STALL_LIMIT = 2
 
-# Fungsi untuk menghitung total jarak dalam rute
-def total_distance(route, start_point, end_point):
-    distance = distance_between_points(start_point, route[0])
-    for i in range(len(route) - 1):
-        distance += distance_between_points(route[i], route[i + 1])
-    distance += distance_between_points(route[-1], end_point)
-    return distance
-
-# Kelas PSO untuk TSP
+# Kelas PSO diskrit untuk TSP: posisi berupa permutasi, kecepatan berupa permutasi posisi (urutan swap)
 class PSO_TSP:
-    def __init__(self, waypoints, start_point, end_point, num_particles, num_iterations, inertia_weight, c1, c2):
-        self.waypoints = waypoints
-        self.start_point = start_point
-        self.end_point = end_point
+    def __init__(self, distances, num_particles, num_iterations, inertia_weight, c1, c2, local_search=None, seed=None,
+                 time_limit=None, patience=None, target_distance=None, callback=None, initial_routes=None, neighbors=None):
+        # distances: matriks (N+2)x(N+2) dari distance_matrix.build_distance_matrix
+        self.distances = distances
+        self.num_waypoints = num_waypoints(distances)
         self.num_particles = num_particles
         self.num_iterations = num_iterations
-        self.inertia_weight = inertia_weight  # Faktor inersia
+        self.inertia_weight = inertia_weight  # Faktor inersia: bagian kecepatan lama yang dipertahankan
         self.c1 = c1  # Koefisien kognitif
         self.c2 = c2  # Koefisien sosial
-
-        self.distances = self.calculate_distances_matrix()
-        self.particles = [random.sample(range(len(waypoints)), len(waypoints)) for _ in range(num_particles)]
-        self.p_best = self.particles[:]
-        self.g_best = min(self.particles, key=lambda p: self.route_distance(p))
-        self.velocities = [self.initialize_velocity() for _ in range(num_particles)]
-
-    def calculate_distances_matrix(self):
-        num_waypoints = len(self.waypoints)
-        distances = np.zeros((num_waypoints, num_waypoints))
-        for i in range(num_waypoints):
-            for j in range(i + 1, num_waypoints):
-                distances[i][j] = distance_between_points(self.waypoints[i], self.waypoints[j])
-                distances[j][i] = distances[i][j]
-        return distances
+        # Polishing opsional dari local_search: None, "2opt", "or_opt", "3opt" atau "vnd"
+        self.local_search = local_search
+        # Kandidat tetangga (N, k) untuk local search, misalnya dari spatial_index; None = dari matriks jarak
+        self.neighbors = neighbors
+        self.rng = make_rng(seed)
+        # Berhenti lebih awal (batas waktu, stagnasi, target jarak) dan akses rute terbaik sementara
+        self.monitor = SearchMonitor(time_limit, patience, target_distance, callback)
+
+        n = self.num_waypoints
+        self.identity = np.tile(np.arange(n), (num_particles, 1))
+        # offsets[p] = p * N: indeks datar (partikel p, kolom k) -> p * N + k untuk np.take
+        self.offsets = (np.arange(num_particles) * n)[:, None]
+        # Swarm sebagai array (P, N); positions[p, v] = posisi waypoint v pada partikel p
+        self.particles = self.rng.permuted(self.identity, axis=1)
+        # Sebagian partikel awal bisa diganti rute dari construction (array (M, N))
+        if initial_routes is not None:
+            seed_population(self.particles, as_routes(initial_routes, n))
+        self.positions = np.empty_like(self.particles)
+        self.update_positions()
+        self.velocities = self.initialize_velocity()
+        # Jumlah iterasi berturut-turut tanpa perbaikan p_best per partikel
+        self.stall = np.zeros(num_particles, dtype=np.intp)
+
+        # p_best adalah salinan (bukan alias) dan fitness-nya disimpan agar tidak dihitung ulang
+        self.fitness = population_lengths(distances, self.particles)
+        self.p_best = self.particles.copy()
+        self.p_best_fitness = self.fitness.copy()
+        best = int(np.argmin(self.p_best_fitness))
+        self.g_best = self.p_best[best].copy()
+        self.g_best_fitness = float(self.p_best_fitness[best])
 
     def route_distance(self, route):
-        waypoints_order = [self.waypoints[i] for i in route]
-        return total_distance(waypoints_order, self.start_point, self.end_point)
+        return route_length(self.distances, route)
 
-    def initialize_velocity(self):
-        # Inisialisasi kecepatan sebagai daftar pertukaran acak
-        return [(random.randint(0, len(self.waypoints) - 1), random.randint(0, len(self.waypoints) - 1)) for _ in range(len(self.waypoints))]
+    def update_positions(self):
+        np.put(self.positions, self.particles + self.offsets, self.identity)
 
-    def apply_velocity(self, particle, velocity):
-        # Terapkan pertukaran posisi berdasarkan kecepatan
-        for i, j in velocity:
-            particle[i], particle[j] = particle[j], particle[i]
-        return particle
+    def initialize_velocity(self):
+        """
+        Kecepatan sebagai permutasi posisi (P, N): partikel berpindah ke particles[p, velocities[p]].
+        Awalnya berupa satu inversi segmen acak per partikel.
+        """
+        return self.random_inversions(self.num_particles)
+
+    def random_inversions(self, count):
+        # Permutasi posisi (count, N) yang membalik satu segmen acak per baris
+        n = self.num_waypoints
+        cuts = np.sort(self.rng.integers(0, n + 1, size=(count, 2)), axis=1)
+        start, end = cuts[:, :1], cuts[:, 1:]
+        positions = self.identity[:count]
+        return np.where((positions >= start) & (positions < end), start + end - 1 - positions, positions)
+
+    def cycle_labels(self, moves):
+        """
+        Label siklus setiap kolom pada permutasi posisi moves (P, N): indeks terkecil di siklusnya.
+        Pointer jumping untuk seluruh swarm sekaligus: setelah langkah ke-k label mencakup 2**k
+        langkah siklus, dan berhenti begitu tidak ada label yang berubah (semua siklus tertutup).
+        """
+        labels = self.identity.copy()
+        jump = moves + self.offsets
+        for _ in range(max(1, int(np.ceil(np.log2(max(self.num_waypoints, 2)))))):
+            reached = np.take(labels, jump)
+            if not (reached < labels).any():
+                break
+            np.minimum(labels, reached, out=labels)
+            jump = np.take(jump, jump)
+        return labels
+
+    def apply_moves(self, moves, probability):
+        """
+        Terapkan sebagian permutasi posisi moves: setiap siklusnya (rangkaian swap dasar yang
+        menyelesaikan siklus itu) diterima dengan peluang probability per partikel.
+        Mengembalikan permutasi posisi yang benar-benar diterapkan.
+        """
+        labels = self.cycle_labels(moves)
+        accept = self.rng.random(moves.shape) < probability[:, None]
+        accept = np.take(accept, labels + self.offsets)
+        applied = np.where(accept, moves, self.identity)
+        self.particles = np.take(self.particles, applied + self.offsets)
+        self.update_positions()
+        return applied
+
+    def move_towards(self, targets, probability):
+        """
+        Basic swap sequence dari setiap partikel menuju targets (array (P, N)) dalam satu langkah:
+        moves[p, k] = posisi waypoint targets[p, k] pada partikel p, sehingga particles[p, moves[p]]
+        sama dengan targets[p]. Swap dasarnya diterima per siklus dengan peluang probability.
+        """
+        moves = np.take(self.positions, targets + self.offsets)
+        return self.apply_moves(moves, probability)
+
+    def diversify(self):
+        # Partikel yang p_best-nya tidak membaik selama STALL_LIMIT iterasi dipindah ke p_best-nya
+        # dengan satu inversi segmen acak, dan kecepatannya di-reset ke inversi itu,
+        # agar swarm tidak menumpuk di g_best
+        stalled = np.flatnonzero(self.stall >= STALL_LIMIT)
+        if len(stalled) == 0:
+            return
+        moves = self.random_inversions(len(stalled))
+        self.particles[stalled] = np.take_along_axis(self.p_best[stalled], moves, axis=1)
+        self.update_positions()
+        self.velocities[stalled] = moves
+        self.stall[stalled] = 0
 
     def update_particles(self):
-        for i, particle in enumerate(self.particles):
-            # Update kecepatan partikel
-            cognitive_component = [(random.randint(0, len(self.waypoints) - 1), random.randint(0, len(self.waypoints) - 1)) for _ in range(int(self.c1))]
-            social_component = [(random.randint(0, len(self.waypoints) - 1), random.randint(0, len(self.waypoints) - 1)) for _ in range(int(self.c2))]
-
-            # Gabungkan kecepatan dengan faktor inersia, kognitif, dan sosial
-            self.velocities[i] = self.apply_velocity(self.velocities[i], cognitive_component + social_component)
-
-            # Update posisi partikel
-            self.particles[i] = self.apply_velocity(particle, self.velocities[i])
-
-            # Update personal best (p_best)
-            if self.route_distance(self.particles[i]) < self.route_distance(self.p_best[i]):
-                self.p_best[i] = self.particles[i]
-
-        # Update global best (g_best)
-        self.g_best = min(self.p_best, key=lambda p: self.route_distance(p))
+        # v = w*v + c1*r1*(p_best - x) + c2*r2*(g_best - x): inersia menerapkan ulang setiap siklus
+        # kecepatan lama dengan peluang w, c*r menjadi peluang menerima setiap siklus swap menuju target
+        full = np.ones(self.num_particles)
+        inertia = self.apply_moves(self.velocities, full * self.inertia_weight)
+        r1 = self.rng.random(self.num_particles)
+        r2 = self.rng.random(self.num_particles)
+        cognitive = self.move_towards(self.p_best, np.minimum(self.c1 * r1, 1.0))
+        g_best = np.broadcast_to(self.g_best, self.particles.shape)
+        social = self.move_towards(g_best, np.minimum(self.c2 * r2, 1.0))
+        # Kecepatan baru = komposisi ketiga perpindahan: x_baru = x_lama[inertia[cognitive[social]]]
+        composed = np.take(inertia, np.take(cognitive, social + self.offsets) + self.offsets)
+        self.velocities = composed
+
+        # Evaluasi seluruh swarm sekaligus, lalu perbarui p_best dan g_best dari fitness yang disimpan
+        self.fitness = population_lengths(self.distances, self.particles)
+        improved = self.fitness < self.p_best_fitness
+        self.p_best[improved] = self.particles[improved]
+        self.p_best_fitness[improved] = self.fitness[improved]
+        self.stall = np.where(improved, 0, self.stall + 1)
+        best = int(np.argmin(self.p_best_fitness))
+        if self.p_best_fitness[best] < self.g_best_fitness:
+            self.g_best = self.p_best[best].copy()
+            self.g_best_fitness = float(self.p_best_fitness[best])
+        self.diversify()
 
     def optimize(self):
-        best_distance = float('inf')
-        best_route = None
+        monitor = self.monitor
+        monitor.start(self.num_iterations)
+        best_distance = self.g_best_fitness
+        best_route = self.g_best.tolist()
+        monitor.report(best_route, best_distance)
         for iteration in range(self.num_iterations):
             self.update_particles()
-            g_best_distance = self.route_distance(self.g_best)
 
-            if g_best_distance < best_distance:
-                best_distance = g_best_distance
-                best_route = self.g_best
+            if self.g_best_fitness < best_distance:
+                best_distance = self.g_best_fitness
+                best_route = self.g_best.tolist()
+
+            if monitor.step(best_route, best_distance):
+                break
 
-            print(f"Iteration {iteration+1}/{self.num_iterations}, Best Distance: {best_distance:.2f} km")
+        if self.local_search:
+            best_route, best_distance = polish_route(best_route, self.distances, self.local_search, self.neighbors)
 
-        return best_route, best_distance
+        return monitor.finish(best_route, best_distance)
 
 # # Kelas PSO untuk TSP
 # class PSO_TSP:
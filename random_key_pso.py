@@ -0,0 +1,111 @@
+# random_key_pso.py
+
+import numpy as np
+from distance_matrix import num_waypoints, population_lengths, route_length
+from local_search import polish_route
+from random_utils import make_rng
+from anytime import SearchMonitor
+from construction import as_routes
+
+# Batas kecepatan per dimensi, relatif terhadap rentang kunci [0, 1)
+MAX_VELOCITY = 0.5
+
+
+# Kelas PSO random-key untuk TSP: partikel berupa vektor float, rute = argsort(kunci)
+class RandomKeyPSO_TSP:
+    def __init__(self, distances, num_particles, num_iterations, inertia_weight, c1, c2, local_search=None, seed=None,
+                 time_limit=None, patience=None, target_distance=None, callback=None, initial_routes=None, neighbors=None):
+        # distances: matriks (N+2)x(N+2) dari distance_matrix.build_distance_matrix
+        self.distances = distances
+        self.num_waypoints = num_waypoints(distances)
+        self.num_particles = num_particles
+        self.num_iterations = num_iterations
+        self.inertia_weight = inertia_weight  # Faktor inersia
+        self.c1 = c1  # Koefisien kognitif
+        self.c2 = c2  # Koefisien sosial
+        # Local search opsional ("2opt", "or_opt", "3opt" atau "vnd") yang dijalankan pada g_best
+        # setiap kali g_best membaik; kunci g_best disusun ulang sesuai rute hasil local search
+        self.local_search = local_search
+        # Kandidat tetangga (N, k) untuk local search, misalnya dari spatial_index; None = dari matriks jarak
+        self.neighbors = neighbors
+        self.rng = make_rng(seed)
+        # Berhenti lebih awal (batas waktu, stagnasi, target jarak) dan akses rute terbaik sementara
+        self.monitor = SearchMonitor(time_limit, patience, target_distance, callback)
+
+        shape = (num_particles, self.num_waypoints)
+        self.particles = self.rng.random(shape)
+        # Sebagian partikel awal bisa diganti rute dari construction: kunci acaknya disusun ulang lewat encode
+        if initial_routes is not None:
+            for i, route in enumerate(as_routes(initial_routes, self.num_waypoints)[:num_particles]):
+                self.particles[i] = self.encode(route, self.particles[i])
+        self.velocities = self.rng.uniform(-MAX_VELOCITY, MAX_VELOCITY, shape)
+
+        self.fitness = population_lengths(distances, self.decode(self.particles))
+        self.p_best = self.particles.copy()
+        self.p_best_fitness = self.fitness.copy()
+        self.g_best = None
+        self.g_best_fitness = np.inf
+        self.g_best_route = None
+        self.update_g_best()
+
+    def route_distance(self, route):
+        return route_length(self.distances, route)
+
+    @staticmethod
+    def decode(particles):
+        # Urutan kunci dari kecil ke besar menjadi urutan kunjungan, sehingga semua waypoint selalu dikunjungi
+        return np.argsort(particles, axis=-1, kind="stable")
+
+    @staticmethod
+    def encode(route, keys):
+        # Susun ulang kunci yang ada agar argsort-nya menghasilkan route
+        encoded = np.empty_like(keys)
+        encoded[np.asarray(route, dtype=np.intp)] = np.sort(keys)
+        return encoded
+
+    def update_g_best(self):
+        best = int(np.argmin(self.p_best_fitness))
+        if self.p_best_fitness[best] >= self.g_best_fitness:
+            return False
+        self.g_best = self.p_best[best].copy()
+        self.g_best_fitness = float(self.p_best_fitness[best])
+        self.g_best_route = self.decode(self.g_best)
+
+        if self.local_search:
+            route, distance = polish_route(self.g_best_route.tolist(), self.distances, self.local_search,
+                                           self.neighbors)
+            if distance < self.g_best_fitness:
+                self.g_best = self.encode(route, self.g_best)
+                self.g_best_fitness = distance
+                self.g_best_route = np.asarray(route)
+                # Rute hasil local search juga menjadi p_best partikel asalnya
+                self.p_best[best] = self.g_best
+                self.p_best_fitness[best] = distance
+        return True
+
+    def update_particles(self):
+        # v = w*v + c1*r1*(p_best - x) + c2*r2*(g_best - x) untuk seluruh swarm sekaligus
+        r1 = self.rng.random(self.particles.shape)
+        r2 = self.rng.random(self.particles.shape)
+        self.velocities *= self.inertia_weight
+        self.velocities += self.c1 * r1 * (self.p_best - self.particles)
+        self.velocities += self.c2 * r2 * (self.g_best - self.particles)
+        np.clip(self.velocities, -MAX_VELOCITY, MAX_VELOCITY, out=self.velocities)
+        self.particles += self.velocities
+
+        self.fitness = population_lengths(self.distances, self.decode(self.particles))
+        improved = self.fitness < self.p_best_fitness
+        self.p_best[improved] = self.particles[improved]
+        self.p_best_fitness[improved] = self.fitness[improved]
+        self.update_g_best()
+
+    def optimize(self):
+        monitor = self.monitor
+        monitor.start(self.num_iterations)
+        monitor.report(self.g_best_route, self.g_best_fitness)
+        for iteration in range(self.num_iterations):
+            self.update_particles()
+            if monitor.step(self.g_best_route, self.g_best_fitness):
+                break
+
+        return monitor.finish()
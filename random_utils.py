@@ -0,0 +1,23 @@
+# random_utils.py
+
+import numpy as np
+
+
+def make_rng(seed=None):
+    """
+    Generator numpy untuk solver. seed boleh None (acak), int, SeedSequence,
+    atau Generator yang sudah ada (dipakai apa adanya, tidak disalin).
+    """
+    return np.random.default_rng(seed)
+
+
+def spawn_rngs(seed, n):
+    """
+    n Generator independen untuk worker/pulau paralel, diturunkan dari seed lewat SeedSequence.
+    Hasilnya sama untuk seed dan n yang sama, berapa pun jumlah proses yang menjalankannya.
+    """
+    if isinstance(seed, np.random.Generator):
+        return seed.spawn(n)
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    return [np.random.default_rng(child) for child in seed.spawn(n)]
@@ -0,0 +1,30 @@
+# shared_array.py
+
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+def create_shared_array(array):
+    """
+    Salin array ke blok shared memory baru.
+    Mengembalikan (shm, spec); spec (nama, shape, dtype) dikirim ke worker untuk attach_shared_array.
+    Pemanggil wajib memanggil shm.close() dan shm.unlink() setelah selesai.
+    """
+    array = np.asarray(array)
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    view = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)
+    view[...] = array
+    return shm, (shm.name, array.shape, array.dtype.str)
+
+
+def attach_shared_array(spec):
+    """
+    Buka array yang dibuat create_shared_array dari proses lain tanpa menyalin data.
+    Objek shm ikut dikembalikan dan harus tetap direferensikan selama array dipakai.
+    """
+    name, shape, dtype = spec
+    # Worker dari multiprocessing memakai resource tracker yang sama dengan pembuat blok,
+    # sehingga blok tetap dihapus sekali oleh pembuatnya lewat unlink()
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
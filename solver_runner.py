@@ -0,0 +1,75 @@
+# solver_runner.py
+
+import queue
+import time
+from collections import namedtuple
+
+# Satu event progres per iterasi solver
+ProgressEvent = namedtuple("ProgressEvent", ["iteration", "max_iterations", "best_distance", "elapsed"])
+
+
+class SolverRun:
+    """
+    Satu eksekusi solver.optimize() di executor latar (ThreadPoolExecutor).
+    Callback monitor solver mengirim ProgressEvent ke queue setiap iterasi; UI mengambilnya lewat poll()
+    tanpa menunggu solver selesai. cancel() menghentikan solver setelah iterasi yang sedang berjalan,
+    dan result() tetap mengembalikan rute terbaik sejauh itu.
+    Solver dijalankan di thread, bukan proses, agar monitor (callback, stop) tetap berbagi memori;
+    solver yang paralel (IslandGA, AntColony dengan n_workers) tetap membuat proses workernya sendiri.
+    """
+
+    def __init__(self, solver, executor):
+        self.solver = solver
+        self.events = queue.SimpleQueue()
+        # Semua event yang sudah diambil poll(), untuk menggambar ulang grafik
+        self.history = []
+        # Diisi thread latar saat optimize() selesai
+        self.finished_at = None
+
+        monitor = solver.monitor
+        previous = monitor.callback
+
+        def callback(monitor):
+            self.events.put(ProgressEvent(monitor.iteration, monitor.max_iterations, monitor.best_distance,
+                                          monitor.elapsed))
+            if previous is not None:
+                previous(monitor)
+
+        monitor.callback = callback
+        self.future = executor.submit(self._optimize)
+
+    def _optimize(self):
+        try:
+            return self.solver.optimize()
+        finally:
+            self.finished_at = time.time()
+
+    def poll(self):
+        """
+        Ambil semua event baru tanpa menunggu; event juga ditambahkan ke history.
+        """
+        events = []
+        while True:
+            try:
+                events.append(self.events.get_nowait())
+            except queue.Empty:
+                break
+        self.history.extend(events)
+        return events
+
+    def cancel(self):
+        self.solver.monitor.stop()
+
+    @property
+    def running(self):
+        return self.future.running()
+
+    def done(self):
+        return self.future.done()
+
+    def result(self):
+        """
+        (best_route, best_distance) dari optimize(); menunggu jika belum selesai
+        dan meneruskan exception dari solver.
+        """
+        return self.future.result()
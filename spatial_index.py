@@ -0,0 +1,90 @@
+# spatial_index.py
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+from distance_matrix import EARTH_RADIUS_KM
+
+
+def unit_vectors(coordinates):
+    """
+    Koordinat (lat, lon) dalam derajat sebagai vektor satuan 3-D (N, 3) di permukaan bola.
+    """
+    points = np.radians(np.asarray(coordinates, dtype=np.float64).reshape(-1, 2))
+    lat, lon = points[:, 0], points[:, 1]
+    cos_lat = np.cos(lat)
+    return np.column_stack([cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)])
+
+
+def chord_to_km(chord):
+    # Panjang tali busur pada bola satuan -> jarak great-circle (km)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.clip(chord / 2, 0.0, 1.0))
+
+
+def km_to_chord(distance_km):
+    return 2 * np.sin(np.minimum(np.asarray(distance_km, dtype=np.float64) / (2 * EARTH_RADIUS_KM), np.pi / 2))
+
+
+class SpatialIndex:
+    """
+    Indeks spasial waypoint: cKDTree atas vektor satuan 3-D, sehingga urutan jarak Euclid (tali busur)
+    sama dengan urutan jarak great-circle dan tidak ada masalah di garis bujur 180 atau kutub.
+    Semua hasil berupa array NumPy; jarak dalam km (great-circle, sama dengan metric "haversine")
+    dan indeks sesuai urutan coordinates, yaitu indeks waypoint pada matriks jarak.
+    """
+
+    def __init__(self, coordinates, leafsize=16):
+        self.coordinates = np.asarray(coordinates, dtype=np.float64).reshape(-1, 2)
+        self.tree = cKDTree(unit_vectors(self.coordinates), leafsize=leafsize, balanced_tree=False)
+
+    @classmethod
+    def from_table(cls, table, leafsize=16):
+        # table: customer.CustomerTable
+        return cls(table.coordinates, leafsize)
+
+    def __len__(self):
+        return len(self.coordinates)
+
+    def knn(self, points, k, workers=1):
+        """
+        k waypoint terdekat dari setiap titik (lat, lon) di points, terurut dari yang terdekat.
+        Mengembalikan (distances_km, indices), masing-masing array (M, k).
+        """
+        k = max(0, min(k, len(self)))
+        queries = unit_vectors(points)
+        if k == 0:
+            return np.empty((len(queries), 0)), np.empty((len(queries), 0), dtype=np.intp)
+        chord, indices = self.tree.query(queries, k=k, workers=workers)
+        return chord_to_km(chord.reshape(len(queries), k)), indices.reshape(len(queries), k).astype(np.intp)
+
+    def neighbors(self, k, workers=1):
+        """
+        Daftar k waypoint terdekat untuk setiap waypoint (tanpa dirinya sendiri), array (N, k).
+        Formatnya sama dengan distance_matrix.nearest_neighbors sehingga bisa dipakai sebagai
+        neighbors di local_search, AntColony dan LK_TSP tanpa memindai matriks jarak N x N.
+        """
+        n = len(self)
+        k = max(0, min(k, n - 1))
+        if k == 0:
+            return np.empty((n, 0), dtype=np.intp)
+        _, indices = self.tree.query(self.tree.data, k=k + 1, workers=workers)
+        # Titik kembar bisa membuat dirinya sendiri bukan hasil pertama, jadi dibuang per baris
+        is_self = indices == np.arange(n)[:, None]
+        is_self[~is_self.any(axis=1), -1] = True
+        return indices[~is_self].reshape(n, k).astype(np.intp)
+
+    def within_radius(self, points, radius_km, workers=1):
+        """
+        Indeks waypoint dalam radius_km (great-circle) dari setiap titik di points.
+        Mengembalikan list array indeks terurut, satu per titik.
+        """
+        results = self.tree.query_ball_point(unit_vectors(points), km_to_chord(radius_km), workers=workers,
+                                             return_sorted=True)
+        return [np.asarray(result, dtype=np.intp) for result in results]
+
+    def count_within_radius(self, points, radius_km, workers=1):
+        """
+        Jumlah waypoint dalam radius_km dari setiap titik di points, array (M,).
+        """
+        return self.tree.query_ball_point(unit_vectors(points), km_to_chord(radius_km), workers=workers,
+                                          return_length=True)
@@ -1,24 +1,175 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
-import random
-from geopy.distance import geodesic
-from data_utils import read_waypoints_from_excel
-from ant_colony import AntColony
+from data_utils import WAYPOINT_FILE_TYPES, file_digest
+from catalog import CatalogStore
+from ant_colony import ACO_VARIANTS, AntColony
 from genetic import GA_TSP
-from particle_swarm import PSO_TSP
-from binary_pso import BPSO_TSP
+from ga_operators import CROSSOVER_OPERATORS, MUTATION_OPERATORS
+from island_ga import IslandGA
+from random_key_pso import RandomKeyPSO_TSP
+from lin_kernighan import LK_TSP
+from distance_matrix import METRICS
+from distance_cache import DistanceMatrixCache
+from local_search import DEFAULT_NEIGHBORS, LOCAL_SEARCH_METHODS
+from spatial_index import SpatialIndex
 from visualization import plot_route_with_satelite
+from solver_runner import SolverRun
+from comparison import ComparisonRun
+from construction import CONSTRUCTION_METHODS, construct_routes
+import io
+import os
 import time
-
-# Fungsi untuk membaca data dari file excel
-def read_excel(file):
-    df = pd.read_excel(file)
-    return df
-
-# Fungsi jarak antara dua titik untuk TSP
-def distance_between_points(p1, p2):
-    return geodesic(p1, p2).kilometers
+from concurrent.futures import ThreadPoolExecutor
+
+# Cache matriks jarak di disk, dipakai bersama oleh semua sesi
+@st.cache_resource
+def get_distance_cache():
+    return DistanceMatrixCache()
+
+# Upload dikonversi sekali menjadi katalog Parquet di disk dengan kunci hash isi file,
+# sehingga sesi berikutnya dengan file yang sama tidak perlu mem-parse Excel lagi
+@st.cache_resource
+def get_catalog_store():
+    return CatalogStore()
+
+@st.cache_resource(max_entries=8)
+def load_uploaded_catalog(digest, file_type, _data):
+    return get_catalog_store().get_or_import(digest, io.BytesIO(_data), file_type)
+
+# Waypoint untuk kota terpilih, dipakai semua tombol dan rerun
+@st.cache_resource(max_entries=32)
+def load_waypoint_table(digest, cities, _catalog):
+    return _catalog.load_table(kota=list(cities))
+
+# k tetangga terdekat per waypoint dari indeks spasial, tanpa memindai matriks jarak N x N;
+# dibangun sekali per pilihan kota dan k, lalu dipakai local search, ACO dan LK semua solver
+@st.cache_resource(max_entries=32)
+def load_neighbors(digest, cities, k, _table):
+    return SpatialIndex.from_table(_table).neighbors(k)
+
+# Thread latar untuk menjalankan solver, dipakai bersama oleh semua sesi;
+# run yang melebihi jumlah core menunggu giliran
+@st.cache_resource
+def get_solver_executor():
+    return ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix="solver")
+
+# Jumlah titik maksimum pada grafik progres
+MAX_CHART_POINTS = 500
+
+def seed_routes(distances, waypoints_coordinates, methods):
+    # Rute awal dari heuristik konstruksi terpilih untuk initial_routes solver; None jika tidak ada yang dipilih
+    if not methods:
+        return None
+    return construct_routes(distances, methods, coordinates=waypoints_coordinates)
+
+def start_run(key, solver, start_time, waypoints_coordinates, title, cities_label):
+    # Run disimpan di session_state agar progres dan hasilnya bertahan saat script di-rerun
+    previous = st.session_state.get(key)
+    if previous is not None and not previous["run"].done():
+        previous["run"].cancel()
+    st.session_state[key] = dict(run=SolverRun(solver, get_solver_executor()), start_time=start_time,
+                                 coordinates=waypoints_coordinates, title=title, cities_label=cities_label)
+
+def distance_chart(run):
+    # Jarak terbaik per iterasi, dicuplik agar grafik tetap ringan untuk run yang panjang
+    history = run.history[::max(1, len(run.history) // MAX_CHART_POINTS)]
+    return pd.DataFrame({"Jarak Terbaik (km)": [event.best_distance for event in history]},
+                        index=pd.Index([event.iteration for event in history], name="Iterasi"))
+
+def progress_fraction(event, time_limit):
+    # Bagian run yang sudah berjalan: menurut jumlah iterasi atau batas waktu, mana yang lebih dekat
+    fractions = []
+    if event.max_iterations:
+        fractions.append(event.iteration / event.max_iterations)
+    if time_limit:
+        fractions.append(event.elapsed / time_limit)
+    return min(max(fractions, default=0.0), 1.0)
+
+@st.fragment(run_every=0.5)
+def show_progress(key):
+    # Hanya fragment ini yang dijalankan ulang setiap 0.5 detik, bukan seluruh script
+    run = st.session_state[key]["run"]
+    run.poll()
+    if run.done():
+        # Jalankan ulang seluruh script agar hasil dan plot rute ditampilkan
+        st.rerun()
+
+    if not run.running:
+        st.progress(0.0, text="Menunggu giliran...")
+    elif run.history:
+        last = run.history[-1]
+        st.progress(progress_fraction(last, run.solver.monitor.time_limit),
+                    text=f"Iterasi {last.iteration}, Jarak Terbaik: {last.best_distance:.2f} km")
+        st.line_chart(distance_chart(run))
+    else:
+        st.progress(0.0, text="Memulai...")
+    if st.button("Batalkan", key=f"cancel_{key}"):
+        run.cancel()
+
+def show_result(key):
+    state = st.session_state[key]
+    run = state["run"]
+    run.poll()
+    best_route_indices, best_distance = run.result()
+
+    # Tambahkan 1 ke setiap indeks di best_route_indices untuk ditampilkan
+    best_route_indices_display = [i + 1 for i in best_route_indices]
+    st.write(f"**{state['title']} Result:**")
+    st.write(f"Optimal Route: {best_route_indices_display}")
+    st.write(f"Total Distance: {best_distance} km")
+
+    computation_time = run.finished_at - state["start_time"]
+    st.write(f"Waktu komputasi: {computation_time:.2f} detik")
+    monitor = run.solver.monitor
+    st.write(f"Berhenti karena: {monitor.stop_reason} ({monitor.iteration} iterasi)")
+    if run.history:
+        st.line_chart(distance_chart(run))
+
+@st.fragment(run_every=0.5)
+def show_comparison_progress():
+    comparison = st.session_state["compare_run"]["run"]
+    if comparison.done():
+        st.rerun()
+
+    for name, event in comparison.poll().items():
+        if event is None:
+            st.progress(0.0, text=f"{name}: menunggu...")
+        else:
+            time_limit = comparison.solvers[name][1].get("time_limit")
+            st.progress(progress_fraction(event, time_limit),
+                        text=f"{name}: iterasi {event.iteration}, Jarak Terbaik: {event.best_distance:.2f} km")
+    if st.button("Batalkan", key="cancel_compare_run"):
+        comparison.cancel()
+
+def show_comparison():
+    state = st.session_state["compare_run"]
+    comparison = state["run"]
+    results = comparison.result()
+
+    st.write(f"**Perbandingan Algoritma** (total waktu: {comparison.finished_at - state['start_time']:.2f} detik)")
+    table = pd.DataFrame([
+        {"Algoritma": name, "Jarak (km)": result["distance"], "Waktu (detik)": result["wall_time"],
+         "Iterasi": result["iterations"], "Berhenti karena": result["stop_reason"]}
+        for name, result in results.items()
+    ])
+    st.dataframe(table, hide_index=True)
+
+    # Kurva konvergensi terhadap waktu, karena arti satu iterasi berbeda antar algoritma
+    curves = []
+    for name, result in results.items():
+        history = result["history"][::max(1, len(result["history"]) // MAX_CHART_POINTS)]
+        curves.append(pd.DataFrame({"Algoritma": name,
+                                    "Waktu (detik)": [elapsed for _, elapsed, _ in history],
+                                    "Jarak Terbaik (km)": [distance for _, _, distance in history]}))
+    if curves:
+        st.line_chart(pd.concat(curves, ignore_index=True), x="Waktu (detik)", y="Jarak Terbaik (km)",
+                      color="Algoritma")
+
+    for tab, (name, result) in zip(st.tabs(list(results)), results.items()):
+        with tab:
+            st.write(f"Optimal Route: {[i + 1 for i in result['route']]}")
+            plot_route_with_satelite(result["route"], state["coordinates"], state["start_point"],
+                                     state["end_point"], f"{name} ({state['cities_label']})")
 
 # TSP Algoritma Genetika, ACO, dan PSO (dummy functions)
 def run_genetic_algorithm(data, pop_size, elite_size, mutation_rate, generations):
@@ -39,8 +190,8 @@ def run_particle_swarm_optimization(data, num_particles, num_iterations, w, c1,
 st.title("📍 Traveling Salesman Problem Solver 🛵")
 st.write("Upload data lokasi dan sesuaikan parameter untuk algoritma TSP menggunakan GA, ACO, dan PSO")
 
-# Input untuk mengunggah file Excel
-uploaded_file = st.file_uploader("Unggah file Excel berisi data lokasi", type=["xlsx"])
+# Input untuk mengunggah file Excel (atau CSV/Parquet untuk data besar)
+uploaded_file = st.file_uploader("Unggah file Excel/CSV/Parquet berisi data lokasi", type=list(WAYPOINT_FILE_TYPES))
 
 
 
@@ -49,15 +200,29 @@ if uploaded_file is not None:
     # Inisiasi titik awal dan titik akhir (lat, lon)
     start_point = (-6.192649980767408, 106.83733906793265)
     end_point = (-6.192649980767408, 106.83733906793265)
-    # Membaca file Excel dan menampilkan data
-    data = read_excel(uploaded_file)
+    # Membaca file (lewat katalog) dan menampilkan data
+    upload = uploaded_file.getvalue()
+    file_type = os.path.splitext(uploaded_file.name)[1].lstrip(".").lower()
+    digest = file_digest(upload)
+    catalog = load_uploaded_catalog(digest, file_type, upload)
+    if catalog.dropped_rows:
+        st.warning(f"{catalog.dropped_rows} baris dilewati karena data kosong atau koordinat tidak valid")
+
+    # Hanya bagian katalog untuk kota terpilih yang dibaca (predicate pushdown)
+    all_cities = catalog.cities()
+    selected_cities = st.multiselect("Kota", all_cities, default=all_cities)
+    if not selected_cities:
+        st.warning("Pilih minimal satu kota.")
+        st.stop()
+    waypoint_table = load_waypoint_table(digest, tuple(selected_cities), catalog)
+    data = catalog.load_frame(kota=selected_cities)
     #agar index dimulai dari angka 1
     data.index = data.index + 1
     st.write("Data Lokasi:")
     st.write(data)
     
-    # Mendapatkan daftar kota yang unik dari data
-    distinct_cities = data['Kota'].dropna().unique().tolist()
+    # Mendapatkan daftar kota yang unik dari waypoint (kategori kota di CustomerTable)
+    distinct_cities = [str(city) for city in waypoint_table.kota_categories]
 
     # Mengurutkan kota secara alfabetis (opsional)
     distinct_cities.sort()
@@ -65,9 +230,30 @@ if uploaded_file is not None:
     cities_label = ', '.join(distinct_cities)
     st.write(f"kota yg dikunjungi {cities_label}")
 
+    # Metode perhitungan jarak untuk matriks jarak
+    distance_metric = st.selectbox("Metode Jarak", METRICS, index=0,
+                                   help="vincenty: elipsoid WGS-84 (cepat), haversine: bola (paling cepat), geodesic: eksak (lambat)")
+    # Local search opsional untuk memoles rute terbaik setiap algoritma
+    polish_option = st.selectbox("Local Search (polishing)", ["none"] + list(LOCAL_SEARCH_METHODS), index=0)
+    local_search = None if polish_option == "none" else polish_option
+    # Seed yang sama menghasilkan rute yang sama, berguna untuk membandingkan algoritma
+    seed_input = st.number_input("Random Seed (0 = acak)", min_value=0, max_value=2**32 - 1, value=0, step=1)
+    seed = int(seed_input) or None
+    # Kriteria berhenti lebih awal untuk semua algoritma: rute terbaik tetap dikembalikan saat batas tercapai
+    time_limit_input = st.number_input("Batas Waktu (detik, 0 = tanpa batas)", min_value=0.0, max_value=3600.0,
+                                       value=0.0, step=1.0)
+    time_limit = time_limit_input or None
+    patience_input = st.number_input("Patience (iterasi tanpa perbaikan, 0 = nonaktif)", min_value=0,
+                                     max_value=100000, value=0, step=10)
+    patience = int(patience_input) or None
+    # Sebagian populasi/swarm awal diisi rute hasil heuristik konstruksi, bukan permutasi acak
+    seeding = st.multiselect("Rute Awal (seeding)", CONSTRUCTION_METHODS, default=[],
+                             help="nearest_neighbor, greedy (greedy edge), christofides (MST + matching greedy), "
+                                  "hilbert (kurva Hilbert atas koordinat)")
+
     
-    #column for widget AG, ACO and PSO
-    col1,coldiv1, col2 ,coldiv2, col3 = st.columns([2, 1, 2, 1, 2])
+    #column for widget AG, ACO, PSO and LK
+    col1, coldiv1, col2, coldiv2, col3, coldiv3, col4 = st.columns([2, 1, 2, 1, 2, 1, 2])
     
 # Menampilkan parameter untuk setiap algoritma
 
@@ -77,6 +263,10 @@ if uploaded_file is not None:
     elite_size = col1.number_input("Elite Size", min_value=1, max_value=100, value=10, step=1)
     mutation_rate = col1.slider("Mutation Rate", min_value=0.0, max_value=1.0, value=0.01, step=0.01)
     generations = col1.number_input("Generations", min_value=10, max_value=1000, value=100, step=10)
+    crossover = col1.selectbox("Crossover", list(CROSSOVER_OPERATORS), index=0)
+    mutation = col1.selectbox("Mutation", list(MUTATION_OPERATORS), index=0)
+    # Lebih dari 1 pulau menjalankan GA model pulau secara paralel di beberapa core
+    num_islands = col1.number_input("Islands (1 = tanpa model pulau)", min_value=1, max_value=64, value=1, step=1)
 
     
     st.markdown("""
@@ -100,6 +290,12 @@ if uploaded_file is not None:
     alpha = col2.number_input("Alpha (pheromone influence)", min_value=0.1, max_value=10.0, value=1.0, step=0.1)
     beta = col2.number_input("Beta (distance influence)", min_value=0.1, max_value=10.0, value=2.0, step=0.1)
     decay = col2.slider("Pheromone Decay", min_value=0.0, max_value=1.0, value=0.5, step=0.05)
+    # Untuk data besar: semut hanya memilih di antara k tetangga terdekat
+    aco_variant = col2.selectbox("ACO Variant", ACO_VARIANTS, index=0,
+                                 help="as: Ant System, mmas: MAX-MIN Ant System, acs: Ant Colony System")
+    aco_candidates = col2.number_input("Candidate Neighbors (0 = semua titik)", min_value=0, max_value=100, value=0, step=5)
+    aco_workers = col2.number_input("Worker Processes", min_value=1, max_value=64, value=1, step=1,
+                                    help="Semut dibagi ke beberapa proses; tidak berlaku untuk acs")
 
     
     st.markdown("""
@@ -122,91 +318,125 @@ if uploaded_file is not None:
     c1 = col3.number_input("Cognitive Coefficient (c1)", min_value=0.1, max_value=2.0, value=1.5, step=0.1)
     c2 = col3.number_input("Social Coefficient (c2)", min_value=0.1, max_value=2.0, value=1.5, step=0.1)
 
-    # Tombol untuk menjalankan algoritma
+    coldiv3.markdown('<div class="vertical-divider"></div>', unsafe_allow_html=True)
+
+    # Parameter untuk Lin-Kernighan
+    col4.subheader("Lin-Kernighan Parameters")
+    lk_time_limit = col4.number_input("Time Limit (detik)", min_value=1.0, max_value=600.0, value=10.0, step=1.0)
+    lk_max_kicks = col4.number_input("Max Kicks (0 = tanpa batas)", min_value=0, max_value=1000000, value=0, step=100)
+    lk_candidates = col4.number_input("Candidate Neighbors", min_value=3, max_value=30, value=8, step=1)
+    lk_max_depth = col4.number_input("Max Depth", min_value=2, max_value=20, value=6, step=1)
+
+    # Kandidat tetangga dari indeks spasial: DEFAULT_NEIGHBORS untuk local search GA dan PSO,
+    # candidate_k untuk ACO (hanya jika mode candidate list dipilih) dan num_candidates untuk LK
+    cities_key = tuple(selected_cities)
+    neighbors = load_neighbors(digest, cities_key, DEFAULT_NEIGHBORS, waypoint_table)
+    aco_neighbors = load_neighbors(digest, cities_key, aco_candidates, waypoint_table) if aco_candidates else None
+    lk_neighbors = load_neighbors(digest, cities_key, lk_candidates, waypoint_table)
+
+    # Parameter setiap solver, dipakai tombol per algoritma maupun mode Run All
+    ga_params = dict(pop_size=pop_size, elite_size=elite_size, mutation_rate=mutation_rate, generations=generations,
+                     local_search=local_search, crossover=crossover, mutation=mutation, seed=seed,
+                     time_limit=time_limit, patience=patience, neighbors=neighbors)
+    aco_params = dict(n_ants=n_ants, n_best=n_best, n_iterations=n_iterations, decay=decay, alpha=alpha, beta=beta,
+                      local_search=local_search, candidate_k=aco_candidates or None, variant=aco_variant, seed=seed,
+                      time_limit=time_limit, patience=patience, neighbors=aco_neighbors)
+    # PSO random-key: setiap rute hasil decode selalu mengunjungi semua waypoint
+    pso_params = dict(num_particles=num_particles, num_iterations=num_iterations, inertia_weight=w, c1=c1, c2=c2,
+                      local_search=local_search, seed=seed, time_limit=time_limit, patience=patience,
+                      neighbors=neighbors)
+    lk_params = dict(time_limit=lk_time_limit, max_iterations=lk_max_kicks or None, num_candidates=lk_candidates,
+                     max_depth=lk_max_depth, seed=seed, patience=patience, neighbors=lk_neighbors)
+
+    # Tombol untuk menjalankan algoritma: solver berjalan di latar, progresnya ditampilkan di kolom masing-masing
     if col1.button("Run Genetic Algorithm"):
         start_time = time.time()
-         
-       
-      
-        waypoints = read_waypoints_from_excel(uploaded_file)
-      
-        waypoints_coordinates = [(item.latitude, item.longitude) for item in waypoints]
-
-        ga_tsp = GA_TSP(waypoints_coordinates, start_point, end_point, pop_size, elite_size, mutation_rate, generations)
-        best_route_indices, best_distance = ga_tsp.optimize()
-
-
-        # Tambahkan 1 ke setiap indeks di best_route_indices untuk ditampilkan
-        best_route_indices_display = [i + 1 for i in best_route_indices]
-
-        # Tetap gunakan best_route_indices asli untuk pengambilan koordinat
-        best_route_coordinates = [waypoints_coordinates[i] for i in best_route_indices]
-        col1.write("**Genetic Algorithm Result:**")
-        col1.write(f"Optimal Route: {best_route_indices_display}")
-        col1.write(f"Total Distance: {best_distance} km")
-
-        end_time = time.time()
-        computation_time = end_time - start_time
-        col1.write(f"Waktu komputasi: {computation_time:.2f} detik")
+        waypoints_coordinates = waypoint_table.coordinates
 
-        plot_route_with_satelite(best_route_indices, waypoints_coordinates, start_point, end_point, f"Genetic Algorithm ({cities_label})")
+        distances = get_distance_cache().get_or_build(waypoints_coordinates, start_point, end_point, distance_metric)
 
-    
+        initial_routes = seed_routes(distances, waypoints_coordinates, seeding)
+        if num_islands > 1:
+            ga_tsp = IslandGA(distances, num_islands=num_islands, initial_routes=initial_routes, **ga_params)
+        else:
+            ga_tsp = GA_TSP(distances, initial_routes=initial_routes, **ga_params)
+        start_run("ga_run", ga_tsp, start_time, waypoints_coordinates, "Genetic Algorithm", cities_label)
 
     if col2.button("Run Ant Colony Optimization"):
         start_time = time.time()
-        # aco_route, aco_distance = run_ant_colony_optimization(data, n_ants, n_iterations, alpha, beta, decay)
-        # Membaca waypoint dari file Excel
-        waypoints = read_waypoints_from_excel(uploaded_file)
-        waypoints_coordinates = [(item.latitude, item.longitude) for item in waypoints]
- 
-        
-        # Menjalankan algoritma ACO untuk TSP
-        aco = AntColony(waypoints_coordinates, start_point, end_point, n_ants, n_best, n_iterations, decay, alpha, beta)
-        best_route_indices, best_distance = aco.optimize()
+        waypoints_coordinates = waypoint_table.coordinates
 
-        # Tambahkan 1 ke setiap indeks di best_route_indices untuk ditampilkan
-        best_route_indices_display = [i + 1 for i in best_route_indices]
-
-        # Tetap gunakan best_route_indices asli untuk pengambilan koordinat
-        best_route_coordinates = [waypoints_coordinates[i] for i in best_route_indices]
-        
-        col2.write("**Ant Colony Optimization Result:**")
-        col2.write(f"Optimal Route: {best_route_indices_display}")
-        col2.write(f"Total Distance: {best_distance} km")
+        # Menjalankan algoritma ACO untuk TSP
+        distances = get_distance_cache().get_or_build(waypoints_coordinates, start_point, end_point, distance_metric)
+        aco = AntColony(distances, n_workers=aco_workers if aco_variant != "acs" else 1,
+                        initial_routes=seed_routes(distances, waypoints_coordinates, seeding), **aco_params)
+        start_run("aco_run", aco, start_time, waypoints_coordinates, "Ant Colony Optimization", cities_label)
 
-        end_time = time.time()
-        computation_time = end_time - start_time
-        col2.write(f"Waktu komputasi: {computation_time:.2f} detik")
-        # Menampilkan rute dalam plot
-        plot_route_with_satelite(best_route_indices, waypoints_coordinates, start_point, end_point, f"Ant Colony Optimization ({cities_label})")
+    if col3.button("Run Particle Swarm Optimization"):
+        start_time = time.time()
+        waypoints_coordinates = waypoint_table.coordinates
 
+        distances = get_distance_cache().get_or_build(waypoints_coordinates, start_point, end_point, distance_metric)
+        pso = RandomKeyPSO_TSP(distances, initial_routes=seed_routes(distances, waypoints_coordinates, seeding),
+                               **pso_params)
+        start_run("pso_run", pso, start_time, waypoints_coordinates, "Particle Swarm Optimization", cities_label)
 
-    if col3.button("Run Particle Swarm Optimization"):
+    if col4.button("Run Lin-Kernighan"):
+        start_time = time.time()
+        waypoints_coordinates = waypoint_table.coordinates
+
+        distances = get_distance_cache().get_or_build(waypoints_coordinates, start_point, end_point, distance_metric)
+        lk = LK_TSP(distances, initial_routes=seed_routes(distances, waypoints_coordinates, seeding), **lk_params)
+        start_run("lk_run", lk, start_time, waypoints_coordinates, "Lin-Kernighan", cities_label)
+
+    # Run yang masih berjalan menampilkan progres, run yang selesai menampilkan hasil dan plot rute
+    finished = []
+    for key, col in (("ga_run", col1), ("aco_run", col2), ("pso_run", col3), ("lk_run", col4)):
+        if key not in st.session_state:
+            continue
+        with col:
+            if st.session_state[key]["run"].done():
+                show_result(key)
+                finished.append(key)
+            else:
+                show_progress(key)
+
+    for key in finished:
+        state = st.session_state[key]
+        best_route_indices, _ = state["run"].result()
+        plot_route_with_satelite(best_route_indices, state["coordinates"], start_point, end_point,
+                                 f"{state['title']} ({state['cities_label']})")
+
+    # Mode perbandingan: waypoint dan matriks jarak dibangun sekali, lalu semua algoritma berjalan
+    # bersamaan di proses terpisah sehingga total waktunya mendekati algoritma paling lambat
+    st.divider()
+    if st.button("Run All (bandingkan semua algoritma)"):
         start_time = time.time()
-        waypoints = read_waypoints_from_excel(uploaded_file)
-        waypoints_coordinates = [(item.latitude, item.longitude) for item in waypoints]
- 
-        
-        # Membaca waypoint dari file Excel
-        bpso = BPSO_TSP(waypoints_coordinates, start_point, end_point, num_particles, num_iterations, w, c1, c2)
-        best_route_indices, best_distance = bpso.optimize()
-
-        # Tambahkan 1 ke setiap indeks di best_route_indices untuk ditampilkan
-        best_route_indices_display = [i + 1 for i in best_route_indices]
-        
-        
-        col3.write("**Particle Swarm Optimization Result:**")
-        
-
-        # col3.write(f"Optimal Route: {best_route_indices}")
-        col3.write(f"Optimal Route: {best_route_indices_display}")
-        col3.write(f"Total Distance: {best_distance} km")
-
-        end_time = time.time()
-        computation_time = end_time - start_time
-        col3.write(f"Waktu komputasi: {computation_time:.2f} detik")
-        plot_route_with_satelite(best_route_indices, waypoints_coordinates, start_point, end_point, f"Particle Swarm Optimization ({cities_label})")
+        waypoints_coordinates = waypoint_table.coordinates
+
+        distances = get_distance_cache().get_or_build(waypoints_coordinates, start_point, end_point, distance_metric)
+        # Rute awal dibangun sekali dan dipakai semua solver
+        seeded = dict(initial_routes=seed_routes(distances, waypoints_coordinates, seeding))
+        # Setiap solver sudah mendapat proses sendiri, jadi GA pulau dan ACO multi-proses tidak dipakai di sini
+        solvers = {
+            "Genetic Algorithm": (GA_TSP, dict(ga_params, **seeded)),
+            "Ant Colony Optimization": (AntColony, dict(aco_params, **seeded)),
+            "Particle Swarm Optimization": (RandomKeyPSO_TSP, dict(pso_params, **seeded)),
+            "Lin-Kernighan": (LK_TSP, dict(lk_params, **seeded)),
+        }
+        previous = st.session_state.get("compare_run")
+        if previous is not None and not previous["run"].done():
+            previous["run"].cancel()
+        st.session_state["compare_run"] = dict(run=ComparisonRun(distances, solvers, get_solver_executor()),
+                                               start_time=start_time, coordinates=waypoints_coordinates,
+                                               start_point=start_point, end_point=end_point,
+                                               cities_label=cities_label)
+
+    if "compare_run" in st.session_state:
+        if st.session_state["compare_run"]["run"].done():
+            show_comparison()
+        else:
+            show_comparison_progress()
 
 else:
     st.write("Silakan unggah file Excel untuk memulai.")